@@ -17,7 +17,7 @@ from app.models.base import Base
 from app.utils.db import get_asyncpg_connect_args
 
 # Import every model module so Alembic sees all tables
-from app.models import item, user  # noqa: F401
+from app.models import idempotency, item, user  # noqa: F401
 
 config = context.config
 settings = get_settings()
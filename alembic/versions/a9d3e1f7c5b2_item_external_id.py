@@ -0,0 +1,47 @@
+"""Item external_id for bulk upserts
+
+Revision ID: a9d3e1f7c5b2
+Revises: f2c8d4a6b9e0
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a9d3e1f7c5b2"
+down_revision: str | None = "f2c8d4a6b9e0"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Nullable with no default: a metadata-only change, no table rewrite.
+    op.add_column(
+        "items",
+        sa.Column("external_id", sa.String(length=255), nullable=True),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f("ix_items_external_id"),
+            "items",
+            ["external_id"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            op.f("ix_items_external_id"),
+            table_name="items",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("items", "external_id")
@@ -0,0 +1,63 @@
+"""Item delta sync: (updated_at, id) index and tombstones
+
+Revision ID: e5a7c2f0b8d1
+Revises: c4b1d9a2e7f3
+Create Date: 2026-10-19
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a7c2f0b8d1"
+down_revision: str | None = "c4b1d9a2e7f3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "item_tombstones",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column(
+            "deleted_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_item_tombstones_deleted_at_id",
+        "item_tombstones",
+        ["deleted_at", "id"],
+        unique=False,
+    )
+
+    # items can be large: build the index without blocking writes.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_items_updated_at_id",
+            "items",
+            ["updated_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_items_updated_at_id",
+            table_name="items",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    op.drop_index("ix_item_tombstones_deleted_at_id", table_name="item_tombstones")
+    op.drop_table("item_tombstones")
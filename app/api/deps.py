@@ -2,31 +2,74 @@
 Shared FastAPI dependencies for the API layer.
 """
 
-from fastapi import Depends
+from datetime import datetime
+from typing import Any
+
+from fastapi import Depends, Header, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.config import get_settings
 from app.core.exceptions import UnauthorizedException
+from app.core.idempotency import begin_idempotent_request
 from app.core.supabase_security import decode_supabase_jwt
-from app.database import get_db
+from app.core.timing import phase
+from app.database import get_db, get_read_db
 from app.models.user import User
-from app.services.auth import AuthService
+from app.services.auth import AuthService, identity_cache
+
+settings = get_settings()
 
 security_scheme = HTTPBearer(auto_error=False)
 
+# Columns kept in the identity cache – never the password hash.
+_IDENTITY_FIELDS = ("id", "email", "supabase_user_id", "is_active", "is_superuser")
+_IDENTITY_TIMESTAMPS = ("created_at", "updated_at")
+
+
+async def _remember_user(user: User) -> None:
+    if settings.IDENTITY_CACHE_TTL_SECONDS <= 0:
+        return
+    data: dict[str, Any] = {field: getattr(user, field) for field in _IDENTITY_FIELDS}
+    for field in _IDENTITY_TIMESTAMPS:
+        data[field] = getattr(user, field).isoformat()
+    await identity_cache.set(user.supabase_user_id, data)
+
+
+async def _cached_user(db: AsyncSession, supabase_user_id: str) -> User | None:
+    """The cached user, attached to `db` without a query – or None on a miss."""
+    if settings.IDENTITY_CACHE_TTL_SECONDS <= 0:
+        return None
+    data = await identity_cache.get(supabase_user_id)
+    if data is None:
+        return None
+    user = User(
+        **{field: data[field] for field in _IDENTITY_FIELDS},
+        **{
+            field: datetime.fromisoformat(data[field]) for field in _IDENTITY_TIMESTAMPS
+        },
+    )
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(security_scheme),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ) -> User:
     """
     Extracts & validates the JWT from the Authorization header.
     Returns the authenticated User or raises 401.
+    The user lookup may be served by a read replica; first-login provisioning
+    writes, which pins the rest of the session to the primary. Known users
+    are served from the identity cache for IDENTITY_CACHE_TTL_SECONDS.
     """
     if credentials is None:
         raise UnauthorizedException()
 
-    payload = await decode_supabase_jwt(credentials.credentials)
+    with phase("auth"):
+        payload = await decode_supabase_jwt(credentials.credentials)
     supabase_user_id = payload.get("sub")
     email = payload.get("email")
 
@@ -37,7 +80,11 @@ async def get_current_user(
 
     # If the token doesn't include email (can happen depending on provider/claims),
     # still allow authentication for already-provisioned users.
-    existing = await svc.get_user_by_supabase_user_id(supabase_user_id)
+    existing = await _cached_user(db, supabase_user_id)
+    if existing is None:
+        existing = await svc.get_user_by_supabase_user_id(supabase_user_id)
+        if existing is not None:
+            await _remember_user(existing)
     if existing is not None:
         if not existing.is_active:
             raise UnauthorizedException("User not found or inactive")
@@ -54,4 +101,31 @@ async def get_current_user(
     if user is None or not user.is_active:
         raise UnauthorizedException("User not found or inactive")
 
+    # Not cached yet: the row is uncommitted until the request succeeds.
     return user
+
+
+async def idempotency_key(
+    request: Request,
+    key: str | None = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Client-generated key (e.g. a UUID); retries with the same key replay the first response",
+    ),
+    # Before `current_user`: route dependencies resolve ahead of the
+    # endpoint's own, so this pins the request session to the primary
+    # before the user lookup can take a read connection.
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> None:
+    """
+    Opt-in Idempotency-Key handling for POST endpoints on an
+    `IdempotentRoute` router: claims the key for this user, or replays the
+    stored response of the request that claimed it (see
+    `app.core.idempotency`). Without the header, requests run normally.
+    Only for writing endpoints – it pins the request session to the primary.
+    """
+    if key is None:
+        return
+    await begin_idempotent_request(request, f"{current_user.id}:{key}")
@@ -8,7 +8,9 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_user
+from app.core.deadlines import DeadlineRoute
 from app.core.exceptions import AppException
+from app.core.timing import phase
 from app.database import get_db
 from app.models.user import User
 from app.schemas.auth import (
@@ -19,7 +21,7 @@ from app.schemas.auth import (
 )
 from app.utils.response import success_response
 
-router = APIRouter()
+router = APIRouter(route_class=DeadlineRoute)
 
 
 @router.post("/register", status_code=201)
@@ -48,9 +50,10 @@ async def refresh(data: RefreshRequest):
 
 @router.get("/me")
 async def me(current_user: User = Depends(get_current_user)):
-    user_data = UserRead.from_orm(current_user)
-    return success_response(
-        data=user_data,
-        message="User data retrieved successfully",
-        response_code=200,
-    )
+    with phase("serialize"):
+        user_data = UserRead.from_orm(current_user)
+        return success_response(
+            data=user_data,
+            message="User data retrieved successfully",
+            response_code=200,
+        )
@@ -1,11 +1,25 @@
-"""Health-check endpoint – used by Docker HEALTHCHECK & load balancers."""
+"""Health-check endpoints – used by Docker HEALTHCHECK & load balancers.
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession
+None of these touch the request DB pool; database state comes from the
+background probe in `app.core.readiness`.
+"""
+
+from fastapi import APIRouter
 
 from app.config import get_settings
-from app.database import get_db
+from app.core.admission import admission_status
+from app.core.exceptions import AppException
+from app.core.logs import logging_status
+from app.core.loop_monitor import loop_lag_status
+from app.core.pg_listener import listener_status
+from app.core.readiness import (
+    database_status,
+    ensure_database_probed,
+    is_ready,
+    pool_status,
+    readiness_snapshot,
+)
+from app.services.item import create_batcher
 from app.utils.response import success_response
 
 router = APIRouter()
@@ -13,15 +27,16 @@ settings = get_settings()
 
 
 @router.get("")
-async def health(db: AsyncSession = Depends(get_db)):
+async def health():
     """
-    Returns 200 if the service + DB are reachable.
+    Service + DB status from the last background probe (or an on-demand one
+    before the first has completed), plus pool saturation,
+    admission-control counters, the LISTEN connection state, create
+    batching counters, the event-loop lag histogram and the log queue.
     """
-    try:
-        await db.execute(text("SELECT 1"))
-        db_ok = True
-    except Exception:
-        db_ok = False
+    await ensure_database_probed()
+    database = database_status()
+    db_ok = database["ok"] is True
 
     return success_response(
         data={
@@ -29,7 +44,39 @@ async def health(db: AsyncSession = Depends(get_db)):
             "environment": settings.ENVIRONMENT,
             "version": settings.APP_VERSION,
             "database": "ok" if db_ok else "unreachable",
+            "database_probe": database,
+            "pool": pool_status(),
+            "admission": admission_status(),
+            "listener": listener_status(),
+            "create_batching": create_batcher.stats() if create_batcher else None,
+            "event_loop_lag": loop_lag_status(),
+            "logging": logging_status(),
         },
         message="Health check completed",
         response_code=200 if db_ok else 503,
     )
+
+
+@router.get("/live")
+async def live():
+    """
+    Liveness probe: 200 whenever the worker can serve requests at all.
+    """
+    return success_response(data={"status": "alive"}, message="Service is alive")
+
+
+@router.get("/ready")
+async def ready():
+    """
+    Readiness probe: 200 once startup warm-up has finished and the last
+    background DB probe succeeded, 503 otherwise.
+    Point load balancers here so cold workers don't receive traffic.
+    """
+    if not is_ready():
+        raise AppException(status_code=503, detail="Service is not ready")
+
+    return success_response(
+        data=readiness_snapshot(),
+        message="Service is ready",
+        response_code=200,
+    )
@@ -1,56 +1,189 @@
 """CRUD endpoints for Items."""
 
+from datetime import UTC, datetime, timedelta
+from typing import Literal
+
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user
-from app.core.exceptions import NotFoundException
-from app.database import get_db
+from app.api.deps import get_current_user, idempotency_key
+from app.config import get_settings
+from app.core.deadlines import deadline
+from app.core.exceptions import AppException, NotFoundException
+from app.core.fanout import sse_stream
+from app.core.idempotency import IdempotentRoute
+from app.core.pg_listener import listener_status
+from app.core.timing import phase
+from app.database import get_db, get_read_db
 from app.models.user import User
-from app.schemas.item import ItemCreate, ItemRead, ItemUpdate
-from app.services.item import ItemService
+from app.schemas.item import (
+    ITEM_FIELDS,
+    ItemBulkDelete,
+    ItemBulkDeleteResult,
+    ItemBulkUpdate,
+    ItemBulkUpdateResult,
+    ItemChanges,
+    ItemCreate,
+    ItemRead,
+    ItemUpdate,
+    ItemUpsertResult,
+    dump_item_fields,
+)
+from app.services.item import ItemService, item_events
 from app.utils.response import list_response, success_response
+from app.utils.sync import decode_sync_token, encode_sync_token
+
+router = APIRouter(route_class=IdempotentRoute)
+settings = get_settings()
+
 
-router = APIRouter()
+def item_fields(
+    fields: str | None = Query(
+        None,
+        description="Comma-separated item fields to return, e.g. `name,price` (`id` is always included)",
+    ),
+) -> tuple[str, ...] | None:
+    """Parse the `fields=` sparse fieldset; None means every field."""
+    if fields is None:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(ITEM_FIELDS)
+    if unknown:
+        raise AppException(
+            status_code=400,
+            detail=f"Unknown item field(s): {', '.join(sorted(unknown))}",
+        )
+    # Model order, so equal field sets share one cache entry.
+    return tuple(field for field in ITEM_FIELDS if field in requested or field == "id")
+
+
+def _serialize(item, fields: tuple[str, ...] | None):
+    if isinstance(item, dict):
+        return item  # Core rows already have ItemRead's keys and types
+    if fields is None:
+        return ItemRead.from_orm(item)
+    return dump_item_fields(item, fields)
 
 
 @router.get("")
 async def list_items(
     page_no: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=200),
-    db: AsyncSession = Depends(get_db),
+    fields: tuple[str, ...] | None = Depends(item_fields),
+    db: AsyncSession = Depends(get_read_db),
 ):
     svc = ItemService(db)
     skip = (page_no - 1) * per_page
-    items, total = await svc.get_all(skip=skip, limit=per_page)
-    items_response = [ItemRead.from_orm(item) for item in items]
-    return list_response(
-        data=items_response,
-        message="Items fetched successfully",
-        response_code=200,
-        table_name="items",
-        current_page=page_no,
-        per_page=per_page,
-        total=total,
+    # Only the requested columns are read – e.g. `name,price` skips the
+    # unbounded `description` text entirely.
+    if settings.ITEM_READ_PATH == "orm":
+        items, total = await svc.get_all(skip=skip, limit=per_page, fields=fields)
+    else:
+        items, total = await svc.get_rows(skip=skip, limit=per_page, fields=fields)
+    with phase("serialize"):
+        items_response = [_serialize(item, fields) for item in items]
+        return list_response(
+            data=items_response,
+            message="Items fetched successfully",
+            response_code=200,
+            table_name="items",
+            current_page=page_no,
+            per_page=per_page,
+            total=total,
+        )
+
+
+# Declared before `/{item_id}` so "changes" isn't parsed as an id.
+@router.get("/changes")
+async def item_changes(
+    since: str | None = Query(None, description="`next_token` from the previous sync"),
+    limit: int = Query(500, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Delta sync for offline clients: items created / updated and ids deleted
+    after `since` (everything when omitted), oldest first. Store `next_token`
+    and keep calling while `has_more` is true.
+    """
+    cursor = None
+    if since is not None:
+        try:
+            cursor = decode_sync_token(since)
+        except ValueError:
+            raise AppException(status_code=400, detail="Invalid sync token")
+        retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        if cursor.updated_at < datetime.now(UTC) - retention:
+            # Deletions this old may have been pruned already.
+            raise AppException(
+                status_code=410, detail="Sync token expired, full resync required"
+            )
+
+    svc = ItemService(db)
+    items, deleted, next_cursor, has_more = await svc.get_changes(cursor, limit=limit)
+    with phase("serialize"):
+        changes = ItemChanges(
+            items=[ItemRead.from_orm(item) for item in items],
+            deleted=deleted,
+            next_token=encode_sync_token(next_cursor),
+            has_more=has_more,
+        )
+        return success_response(
+            data=changes,
+            message="Item changes fetched successfully",
+            response_code=200,
+            table_name="items",
+        )
+
+
+# Declared before `/{item_id}` so "stream" isn't parsed as an id.
+@router.get("/stream")
+@deadline(None)
+async def stream_items():
+    """
+    Server-sent events for item changes on any worker:
+    `event: item` with `{"op": "created" | "updated" | "deleted", "ids": [...]}`,
+    or `{"op": "resync"}` after events may have been missed. A `dropped` event
+    ends the stream of a client that fell too far behind.
+    """
+    if not listener_status()["enabled"]:
+        raise AppException(status_code=503, detail="Item change stream is unavailable")
+    subscription = item_events.subscribe()
+    return StreamingResponse(
+        sse_stream(
+            item_events,
+            subscription,
+            event="item",
+            heartbeat=settings.STREAM_HEARTBEAT_SECONDS,
+        ),
+        media_type="text/event-stream",
+        # Tell nginx not to buffer the stream.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 @router.get("/{item_id}")
-async def get_item(item_id: int, db: AsyncSession = Depends(get_db)):
+async def get_item(
+    item_id: int,
+    fields: tuple[str, ...] | None = Depends(item_fields),
+    db: AsyncSession = Depends(get_read_db),
+):
     svc = ItemService(db)
+    # Single rows come from the full-row cache; only the payload is trimmed.
     item = await svc.get_by_id(item_id)
     if not item:
         raise NotFoundException("Item")
-    item_response = ItemRead.from_orm(item)
-    return success_response(
-        data=item_response,
-        message="Item fetched successfully",
-        response_code=200,
-        table_name="items",
-    )
+    with phase("serialize"):
+        item_response = _serialize(item, fields)
+        return success_response(
+            data=item_response,
+            message="Item fetched successfully",
+            response_code=200,
+            table_name="items",
+        )
 
 
-@router.post("", status_code=201)
+@router.post("", status_code=201, dependencies=[Depends(idempotency_key)])
 async def create_item(
     data: ItemCreate,
     db: AsyncSession = Depends(get_db),
@@ -58,28 +191,122 @@ async def create_item(
 ):
     svc = ItemService(db)
     item = await svc.create(data)
-    item_response = ItemRead.from_orm(item)
-    return success_response(
-        data=item_response,
-        message="Item created successfully",
-        response_code=201,
-        table_name="items",
-    )
+    with phase("serialize"):
+        item_response = ItemRead.from_orm(item)
+        return success_response(
+            data=item_response,
+            message="Item created successfully",
+            response_code=201,
+            table_name="items",
+        )
 
 
-@router.post("/bulk/import", status_code=201)
+@router.post("/bulk/import", status_code=201, dependencies=[Depends(idempotency_key)])
+@deadline(60)  # large payloads; still under gunicorn's --timeout
 async def bulk_create_items(
     items: list[ItemCreate],
+    mode: Literal["insert", "upsert"] = Query(
+        "insert",
+        description="`upsert`: match items on `external_id`; unchanged items are not written",
+    ),
     db: AsyncSession = Depends(get_db),
     _current_user: User = Depends(get_current_user),
 ):
     svc = ItemService(db)
+    if mode == "upsert":
+        return await _upsert_items(svc, items)
     created_items = await svc.create_bulk(items)
-    items_response = [ItemRead.from_orm(item) for item in created_items]
+    with phase("serialize"):
+        items_response = [ItemRead.from_orm(item) for item in created_items]
+        return success_response(
+            data=items_response,
+            message=f"{len(items_response)} items created successfully",
+            response_code=201,
+            table_name="items",
+        )
+
+
+async def _upsert_items(svc: ItemService, items: list[ItemCreate]):
+    external_ids = [item.external_id for item in items]
+    if None in external_ids:
+        raise AppException(
+            status_code=422, detail="Every item needs an external_id in upsert mode"
+        )
+    if len(set(external_ids)) != len(external_ids):
+        raise AppException(
+            status_code=422, detail="Each external_id may appear only once"
+        )
+    if not items:
+        created, updated, unchanged = [], [], []
+    else:
+        created, updated, unchanged = await svc.upsert_bulk(items)
+    with phase("serialize"):
+        result = ItemUpsertResult(created=created, updated=updated, unchanged=unchanged)
+        return success_response(
+            data=result,
+            message=(
+                f"{len(created)} items created, {len(updated)} updated, "
+                f"{len(unchanged)} unchanged"
+            ),
+            response_code=201,
+            table_name="items",
+        )
+
+
+def _check_bulk_size(count: int) -> None:
+    if count > settings.ITEM_BULK_MAX_ITEMS:
+        raise AppException(
+            status_code=413,
+            detail=f"At most {settings.ITEM_BULK_MAX_ITEMS} items per request",
+        )
+
+
+# Declared before `/{item_id}` so "bulk" isn't parsed as an id.
+@router.patch("/bulk")
+@deadline(60)
+async def bulk_update_items(
+    changes: list[ItemBulkUpdate],
+    db: AsyncSession = Depends(get_db),
+    _current_user: User = Depends(get_current_user),
+):
+    """
+    Partial updates for many items in one transaction, applied with one
+    set-based UPDATE per chunk. Returns the updated items and the ids that
+    do not exist.
+    """
+    _check_bulk_size(len(changes))
+    if len({change.id for change in changes}) != len(changes):
+        raise AppException(status_code=422, detail="Each item id may appear only once")
+    svc = ItemService(db)
+    items, not_found = await svc.update_bulk(changes)
+    with phase("serialize"):
+        result = ItemBulkUpdateResult(items=items, not_found=not_found)
+        return success_response(
+            data=result,
+            message=f"{len(items)} items updated successfully",
+            response_code=200,
+            table_name="items",
+        )
+
+
+@router.delete("/bulk")
+@deadline(60)
+async def bulk_delete_items(
+    data: ItemBulkDelete,
+    db: AsyncSession = Depends(get_db),
+    _current_user: User = Depends(get_current_user),
+):
+    """
+    Delete many items in one transaction (`DELETE ... WHERE id = ANY(...)`
+    per chunk). Returns the deleted ids and the ids that do not exist.
+    """
+    _check_bulk_size(len(data.ids))
+    svc = ItemService(db)
+    deleted, not_found = await svc.delete_bulk(data.ids)
     return success_response(
-        data=items_response,
-        message=f"{len(items_response)} items created successfully",
-        response_code=201,
+        data=ItemBulkDeleteResult(deleted=deleted, not_found=not_found),
+        message=f"{len(deleted)} items deleted successfully",
+        response_code=200,
         table_name="items",
     )
 
@@ -95,13 +322,14 @@ async def update_item(
     item = await svc.update(item_id, data)
     if not item:
         raise NotFoundException("Item")
-    item_response = ItemRead.from_orm(item)
-    return success_response(
-        data=item_response,
-        message="Item updated successfully",
-        response_code=200,
-        table_name="items",
-    )
+    with phase("serialize"):
+        item_response = ItemRead.from_orm(item)
+        return success_response(
+            data=item_response,
+            message="Item updated successfully",
+            response_code=200,
+            table_name="items",
+        )
 
 
 @router.delete("/{item_id}", status_code=204)
@@ -4,9 +4,12 @@ Loads from .env file and environment variables.
 Environment variables always override .env file values.
 """
 
+import json
 from functools import lru_cache
+from typing import Annotated
 
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -38,6 +41,36 @@ class Settings(BaseSettings):
     DB_MAX_OVERFLOW: int = 3  # Allow some overflow
     DB_POOL_TIMEOUT: int = 30
     DB_POOL_RECYCLE: int = 300  # recycle stale connections every 5 min
+    # Optional read replicas (comma-separated or JSON list). Each gets its own
+    # pool sized like the primary; `get_read_db` sends SELECTs there.
+    DATABASE_READ_URL: Annotated[list[str], NoDecode] = []
+    # Item list reads: `core` runs a Core select() and serializes the row
+    # mappings as-is; `orm` builds Item instances (same JSON either way).
+    ITEM_READ_PATH: str = "core"  # core | orm
+
+    # ── Startup / readiness ───────────────────────────────
+    # Open the pool, prefetch JWKS and prime hot queries before reporting
+    # ready on /api/v1/health/ready. Disable for quick local restarts.
+    WARMUP_ON_STARTUP: bool = True
+    # Health endpoints report the result of a background `SELECT 1` run on a
+    # dedicated connection instead of querying through the request pool.
+    HEALTH_PROBE_INTERVAL_SECONDS: float = 10.0
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 3.0
+
+    # ── Admission control ─────────────────────────────────
+    # Cap DB-bound requests in flight per worker (0 → DB_POOL_SIZE +
+    # DB_MAX_OVERFLOW) with a short wait queue; the rest get 503 + Retry-After.
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_MAX_IN_FLIGHT: int = 0
+    ADMISSION_MAX_QUEUE: int = 20
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 1.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+
+    # ── Request deadlines ─────────────────────────────────
+    # Default per-request deadline (0 disables) for API routes; individual
+    # routes override it with `@deadline(...)`. Also sent to Postgres as
+    # `SET LOCAL statement_timeout`. Keep it well below gunicorn's --timeout.
+    REQUEST_TIMEOUT_SECONDS: float = 15.0
 
     # ── Auth / JWT ────────────────────────────────────────
     SECRET_KEY: str = "CHANGE-ME-in-production-use-openssl-rand-hex-32"
@@ -58,6 +91,73 @@ class Settings(BaseSettings):
     # project settings; allow both by default.
     SUPABASE_ACCEPTED_ALGS: list[str] = ["RS256", "ES256"]
 
+    # ── Cache ─────────────────────────────────────────────
+    # `memory`: per-worker LRU. `redis`: one cache shared by all workers on a
+    # Redis-compatible server (needs the optional `redis` package).
+    CACHE_BACKEND: str = "memory"  # memory | redis
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_REDIS_TIMEOUT_SECONDS: float = 0.25
+    CACHE_MAX_ENTRIES: int = 10_000
+    # How long a Supabase user → local user mapping is reused without a DB
+    # lookup (0 disables).
+    IDENTITY_CACHE_TTL_SECONDS: int = 60
+
+    # Read-through cache for service reads (ItemService.get_by_id / get_all),
+    # invalidated on commit by the service's writes. TTLs are per method.
+    QUERY_CACHE_ENABLED: bool = True
+    QUERY_CACHE_MAX_ENTRIES: int = 5_000  # per method, memory backend only
+    # With read replicas: reads starting this soon after an invalidation may
+    # still see pre-write rows, so their results aren't cached.
+    QUERY_CACHE_REPLICA_LAG_SECONDS: float = 1.0
+    ITEM_CACHE_TTL_SECONDS: int = 60
+    ITEM_LIST_CACHE_TTL_SECONDS: int = 10
+
+    # ── Cross-worker notifications (LISTEN/NOTIFY) ────────
+    # Writes broadcast cache invalidations to every worker via pg_notify.
+    # LISTEN needs a direct (session) connection: set DATABASE_LISTEN_URL when
+    # DATABASE_URL is a transaction pooler (ALEMBIC_DATABASE_URL is tried next).
+    PG_NOTIFY_ENABLED: bool = True
+    PG_NOTIFY_CHANNEL: str = "app_cache_invalidation"
+    DATABASE_LISTEN_URL: str | None = None
+    PG_LISTEN_KEEPALIVE_SECONDS: float = 30.0
+    # Item create / update / delete events, fanned out to /api/v1/items/stream.
+    ITEM_EVENTS_CHANNEL: str = "app_item_events"
+    STREAM_HEARTBEAT_SECONDS: float = 15.0
+    # Events buffered per client before it is dropped.
+    STREAM_CLIENT_QUEUE_SIZE: int = 100
+    STREAM_MAX_CLIENTS: int = 500  # per worker
+
+    # ── Write batching ────────────────────────────────────
+    # Combine concurrent POST /items creates arriving within the window into
+    # one multi-row INSERT ... RETURNING and a single commit.
+    ITEM_CREATE_BATCHING_ENABLED: bool = False
+    ITEM_CREATE_BATCH_MAX_SIZE: int = 100
+    ITEM_CREATE_BATCH_WINDOW_SECONDS: float = 0.005
+    # PATCH / DELETE /items/bulk: ids per statement (asyncpg allows 32767
+    # bind parameters, an UPDATE row takes up to 7) and per request.
+    ITEM_BULK_CHUNK_SIZE: int = 1_000
+    ITEM_BULK_MAX_ITEMS: int = 10_000
+
+    # ── Idempotency-Key ───────────────────────────────────
+    # `memory`: per worker. `postgres`: the idempotency_keys table, shared by
+    # all workers (needs the migration).
+    IDEMPOTENCY_BACKEND: str = "memory"  # memory | postgres
+    IDEMPOTENCY_TTL_SECONDS: int = 86_400  # how long responses are replayed
+    # How long a claim is held for a running request; retries wait up to
+    # this long for it. Keep it above the longest POST (bulk import: 60s).
+    IDEMPOTENCY_LEASE_SECONDS: float = 90.0
+    # `postgres` store: its own pool per worker, separate from the request
+    # pool (requests claim keys while holding a request connection).
+    IDEMPOTENCY_DB_POOL_SIZE: int = 2
+
+    # ── Delta sync (/items/changes) ───────────────────────
+    # Changes are only served once they are older than the safety window, so
+    # a write transaction that commits late cannot slip behind a client's
+    # token. Keep it above the longest write (bulk import allows 60s).
+    SYNC_SAFETY_WINDOW_SECONDS: float = 65.0
+    # Tombstones older than this are pruned; older tokens get 410 (full resync).
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30
+
     # ── CORS ──────────────────────────────────────────────
     CORS_ORIGINS: list[str] = ["*"]
 
@@ -65,6 +165,59 @@ class Settings(BaseSettings):
     N8N_WEBHOOK_URL: str = ""
     N8N_API_KEY: str = ""
 
+    # ── Observability ─────────────────────────────────────
+    # Emit a `Server-Timing` header (auth / pool / db / serialize / total).
+    # Off by default; when disabled no middleware or DB hooks are installed.
+    SERVER_TIMING_ENABLED: bool = False
+    # Sample event-loop lag (histogram in /api/v1/health) and log the loop
+    # thread's stack whenever something blocks it longer than the threshold.
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL_SECONDS: float = 0.25
+    LOOP_BLOCK_THRESHOLD_SECONDS: float = 0.1
+
+    # ── Logging ───────────────────────────────────────────
+    # Records are queued and written by a background thread, so logging never
+    # blocks the event loop; when LOG_QUEUE_MAX_SIZE records are waiting, new
+    # ones are dropped (and counted in /api/v1/health).
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # json | text
+    LOG_QUEUE_MAX_SIZE: int = 10_000
+    # In-app access log (replaces gunicorn's --access-logfile). Successful
+    # requests are sampled; 4xx/5xx and slow requests are always logged.
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0
+    ACCESS_LOG_SLOW_SECONDS: float = 1.0
+
+    # ── Request profiling (non-prod) ──────────────────────
+    # Requests carrying a token signed with this secret are profiled (see
+    # app/core/profiling.py; mint tokens with `python -m app.tools.profile_token`).
+    # Empty = off. Never installed when ENVIRONMENT=prod.
+    PROFILING_SECRET: str = ""
+    PROFILING_OUTPUT_DIR: str = ""  # default: <tmp>/request-profiles
+    PROFILING_SAMPLE_INTERVAL_SECONDS: float = 0.001
+    PROFILING_MAX_ARTIFACTS: int = 50
+
+    # ── Compression ───────────────────────────────────────
+    # Negotiated on Accept-Encoding; the first encoding the client accepts
+    # wins. br / zstd need the optional `brotli` / `zstandard` packages.
+    # Lower levels trade bytes for CPU (see benchmarks/compression.py).
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_ENCODINGS: list[str] = ["zstd", "br", "gzip"]
+    COMPRESSION_GZIP_LEVEL: int = 5
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+
+    # ── Validators ────────────────────────────────────────
+    @field_validator("DATABASE_READ_URL", mode="before")
+    @classmethod
+    def _split_read_urls(cls, value: object) -> object:
+        if isinstance(value, str):
+            value = value.strip()
+            if value.startswith("["):
+                return json.loads(value)
+            return [url.strip() for url in value.split(",") if url.strip()]
+        return value
+
     # ── Helpers ───────────────────────────────────────────
     @property
     def is_prod(self) -> bool:
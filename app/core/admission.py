@@ -0,0 +1,122 @@
+"""Admission control – shed load before it queues on the DB pool.
+
+Without it, an overloaded worker lets every request wait up to
+`DB_POOL_TIMEOUT` seconds for a pooled connection, so latency grows for
+everyone and clients time out anyway. This middleware caps the number of
+DB-bound requests in flight per worker (by default the pool capacity,
+`DB_POOL_SIZE + DB_MAX_OVERFLOW`) and keeps a short, bounded wait queue.
+Anything beyond that is rejected immediately with 503 + `Retry-After`, so
+admitted requests keep a bounded latency and clients can back off.
+
+Health probes, the item change stream and docs bypass the limiter.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import get_settings
+from app.utils.response import error_response
+
+settings = get_settings()
+
+# Paths that never hold a request-pool connection (the item stream is fed by
+# the LISTEN connection and stays open indefinitely).
+_EXEMPT_PREFIXES = (
+    "/api/v1/health",
+    "/api/v1/items/stream",
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+)
+
+_STATS: dict[str, Any] = {
+    "limit": None,
+    "max_queue": None,
+    "in_flight": 0,
+    "waiting": 0,
+    "admitted": 0,
+    "rejected": 0,
+}
+
+
+def admission_status() -> dict[str, Any]:
+    return dict(_STATS)
+
+
+def busy_response() -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content=error_response(
+            message="Server is busy, please retry shortly",
+            response_code=503,
+        ),
+        headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+    )
+
+
+class AdmissionControlMiddleware:
+    """Pure ASGI middleware – per-worker in-flight cap with a bounded queue."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        limit: int | None = None,
+        max_queue: int | None = None,
+        queue_timeout: float | None = None,
+    ) -> None:
+        self.app = app
+        self.limit = (
+            limit
+            or settings.ADMISSION_MAX_IN_FLIGHT
+            or (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+        )
+        self.max_queue = (
+            settings.ADMISSION_MAX_QUEUE if max_queue is None else max_queue
+        )
+        self.queue_timeout = (
+            settings.ADMISSION_QUEUE_TIMEOUT_SECONDS
+            if queue_timeout is None
+            else queue_timeout
+        )
+        self._slots = asyncio.Semaphore(self.limit)
+        _STATS.update(limit=self.limit, max_queue=self.max_queue)
+
+    async def _acquire(self) -> bool:
+        if not self._slots.locked():
+            await self._slots.acquire()
+            return True
+        if _STATS["waiting"] >= self.max_queue:
+            return False
+        _STATS["waiting"] += 1
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await self._slots.acquire()
+            return True
+        except TimeoutError:
+            return False
+        finally:
+            _STATS["waiting"] -= 1
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(_EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        if not await self._acquire():
+            _STATS["rejected"] += 1
+            await busy_response()(scope, receive, send)
+            return
+
+        _STATS["admitted"] += 1
+        _STATS["in_flight"] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _STATS["in_flight"] -= 1
+            self._slots.release()
@@ -0,0 +1,97 @@
+"""Write combining – many concurrent small writes, one transaction.
+
+`MicroBatcher.submit(value)` parks the caller until its value has been
+handled, together with every other value submitted within `max_delay`
+seconds (or as soon as `max_size` are waiting), by a single call to the
+batch handler. The handler returns one result per value, in order; an
+exception instance in place of a result fails only that caller.
+
+Batches run in a fresh context: they do not inherit the deadline or
+Server-Timing state of the request that happened to open them. A caller that
+gives up (deadline, disconnect) stops waiting but does not cancel the batch.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from collections.abc import Awaitable, Callable
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+BatchHandler = Callable[[list[T]], Awaitable[list[R | BaseException]]]
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    # Callers that stopped waiting never retrieve their result.
+    if not future.cancelled():
+        future.exception()
+
+
+class MicroBatcher(Generic[T, R]):
+    def __init__(
+        self, name: str, handler: BatchHandler, *, max_size: int, max_delay: float
+    ) -> None:
+        self.name = name
+        self.handler = handler
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self._pending: list[tuple[T, asyncio.Future[R]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._running: set[asyncio.Task] = set()
+        self.submitted = 0
+        self.batches = 0
+        self.largest = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "batches": self.batches,
+            "largest": self.largest,
+            "pending": len(self._pending),
+        }
+
+    async def submit(self, value: T) -> R:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[R] = loop.create_future()
+        future.add_done_callback(_consume_exception)
+        self._pending.append((value, future))
+        self.submitted += 1
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.batches += 1
+        self.largest = max(self.largest, len(batch))
+        task = asyncio.get_running_loop().create_task(
+            self._run(batch), context=contextvars.Context()
+        )
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: list[tuple[T, asyncio.Future[R]]]) -> None:
+        try:
+            results = await self.handler([value for value, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"{self.name} batch handler returned {len(results)} results "
+                    f"for {len(batch)} values"
+                )
+        except Exception as exc:  # noqa: BLE001 - re-raised in every caller
+            results = [exc] * len(batch)
+        for (_, future), result in zip(batch, results, strict=True):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,178 @@
+"""Cache backends shared by the auth path and the service layer.
+
+`CACHE_BACKEND` selects the implementation behind `get_cache()`:
+
+- `memory` – per-process LRU with TTLs. No dependencies, but every gunicorn
+  worker keeps (and fills) its own copy.
+- `redis`  – any Redis-compatible server (Redis, Valkey, KeyDB, …) at
+  `CACHE_REDIS_URL`, ideally a local sidecar or unix socket. One copy shared
+  by all workers. Needs the optional `redis` package; without it the app
+  refuses to start.
+
+Values must be JSON-serializable so both backends behave the same. The shared
+backend fails open: if it is unreachable, lookups miss and writes are dropped,
+so callers fall back to the source of truth instead of erroring.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class CacheBackend(ABC):
+    """Async key/value cache with per-entry TTLs (seconds)."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Any | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None: ...
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str) -> None: ...
+
+    @abstractmethod
+    async def clear(self) -> None: ...
+
+    async def close(self) -> None:
+        return None
+
+
+class MemoryCache(CacheBackend):
+    """Size-bounded, in-process LRU. Expired entries are dropped on access."""
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    async def get(self, key: str) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCache(CacheBackend):
+    """Cross-worker cache on a Redis-compatible server; fails open."""
+
+    def __init__(self, url: str, *, prefix: str = "cache:") -> None:
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:  # optional dependency
+            raise RuntimeError(
+                "CACHE_BACKEND=redis requires the `redis` package (pip install redis)"
+            ) from exc
+        self.prefix = prefix
+        # What "unavailable" looks like: connection / timeout / server errors
+        # (all RedisError) and socket errors that escape them.
+        self._unavailable = (redis.RedisError, OSError)
+        self._client = redis.Redis.from_url(
+            url,
+            socket_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS,
+        )
+        self._error_logged = False
+
+    def _failed(self, exc: Exception) -> None:
+        if not self._error_logged:
+            logger.warning("Shared cache unavailable, bypassing it: %s", exc)
+            self._error_logged = True
+
+    async def get(self, key: str) -> Any | None:
+        try:
+            raw = await self._client.get(self.prefix + key)
+        except self._unavailable as exc:
+            self._failed(exc)
+            return None
+        self._error_logged = False
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        try:
+            await self._client.set(
+                self.prefix + key, json.dumps(value), px=max(1, int(ttl * 1000))
+            )
+        except self._unavailable as exc:
+            self._failed(exc)
+
+    async def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        try:
+            await self._client.delete(*(self.prefix + key for key in keys))
+        except self._unavailable as exc:
+            self._failed(exc)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        try:
+            batch = []
+            async for key in self._client.scan_iter(
+                match=f"{self.prefix}{prefix}*", count=500
+            ):
+                batch.append(key)
+                if len(batch) >= 500:
+                    await self._client.unlink(*batch)
+                    batch.clear()
+            if batch:
+                await self._client.unlink(*batch)
+        except self._unavailable as exc:
+            self._failed(exc)
+
+    async def clear(self) -> None:
+        await self.delete_prefix("")
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+@lru_cache
+def get_cache() -> CacheBackend:
+    """Process-wide cache backend selected by `CACHE_BACKEND`."""
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCache(settings.CACHE_REDIS_URL)
+    return MemoryCache(settings.CACHE_MAX_ENTRIES)
+
+
+async def close_cache() -> None:
+    if get_cache.cache_info().currsize:
+        await get_cache().close()
+        get_cache.cache_clear()
@@ -0,0 +1,247 @@
+"""Response compression negotiated on `Accept-Encoding`.
+
+gzip is always available; brotli (`pip install brotli`) and zstd
+(`pip install zstandard`) are used when installed. Among the encodings the
+client accepts, the first one in `COMPRESSION_ENCODINGS` wins.
+
+Buffered responses are compressed once they reach `COMPRESSION_MINIMUM_SIZE`
+(large bodies are compressed in a worker thread so the event loop keeps
+serving). `StreamingResponse` bodies are compressed chunk by chunk and each
+chunk is flushed, so clients still receive data as it is produced.
+Server-sent events and already-encoded responses pass through untouched.
+"""
+
+from __future__ import annotations
+
+import zlib
+from collections.abc import Callable
+from typing import Protocol
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+settings = get_settings()
+
+_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "text/",
+)
+# Buffered bodies above this size are compressed off the event loop.
+_OFFLOAD_BYTES = 256 * 1024
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes:
+        """Compress `data` and flush, so the output is decodable so far."""
+
+    def finish(self) -> bytes:
+        """Return the end of the stream."""
+
+
+class _GzipCompressor:
+    def __init__(self, level: int) -> None:
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    def __init__(self, level: int) -> None:
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data) + self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _ZstdCompressor:
+    def __init__(self, level: int) -> None:
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+_COMPRESSORS: dict[str, Callable[[int], Compressor]] = {"gzip": _GzipCompressor}
+if brotli is not None:
+    _COMPRESSORS["br"] = _BrotliCompressor
+if zstandard is not None:
+    _COMPRESSORS["zstd"] = _ZstdCompressor
+
+
+def available_encodings() -> list[str]:
+    return list(_COMPRESSORS)
+
+
+def default_level(encoding: str) -> int:
+    return {
+        "gzip": settings.COMPRESSION_GZIP_LEVEL,
+        "br": settings.COMPRESSION_BROTLI_QUALITY,
+        "zstd": settings.COMPRESSION_ZSTD_LEVEL,
+    }[encoding]
+
+
+def new_compressor(encoding: str, level: int | None = None) -> Compressor:
+    return _COMPRESSORS[encoding](default_level(encoding) if level is None else level)
+
+
+def compress_body(encoding: str, body: bytes, level: int | None = None) -> bytes:
+    compressor = new_compressor(encoding, level)
+    return compressor.compress(body) + compressor.finish()
+
+
+def negotiate_encoding(accept_encoding: str, preferred: list[str]) -> str | None:
+    """Pick the first of `preferred` that the client accepts (q > 0)."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+
+    wildcard = accepted.get("*", 0.0)
+    for encoding in preferred:
+        if encoding in _COMPRESSORS and accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def _is_compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "").lower()
+    return (
+        "content-encoding" not in headers
+        and not content_type.startswith("text/event-stream")
+        and content_type.startswith(_COMPRESSIBLE_TYPES)
+    )
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware – gzip / br / zstd for buffered and streamed bodies."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int | None = None,
+        encodings: list[str] | None = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = (
+            settings.COMPRESSION_MINIMUM_SIZE if minimum_size is None else minimum_size
+        )
+        self.encodings = encodings or settings.COMPRESSION_ENCODINGS
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.encodings
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        compressor: Compressor | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                # Headers are held back until the first body chunk shows
+                # whether compressing is worth it.
+                if not _is_compressible(Headers(raw=message["headers"])):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                assert start is not None
+                headers = MutableHeaders(scope=start)
+                content_length = int(headers.get("content-length") or 0)
+                small = (
+                    len(body) < self.minimum_size
+                    if not more_body
+                    else 0 < content_length < self.minimum_size
+                )
+                if small:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                compressor = new_compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body:
+                    # Whole body at once: compress it in one go, with a length.
+                    if len(body) > _OFFLOAD_BYTES:
+                        body = await anyio.to_thread.run_sync(
+                            compress_body, encoding, body
+                        )
+                    else:
+                        body = compressor.compress(body) + compressor.finish()
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                del headers["Content-Length"]
+                await send(start)
+
+            chunk = compressor.compress(body) if body else b""
+            if not more_body:
+                chunk += compressor.finish()
+            await send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
+
+        await self.app(scope, receive, send_compressed)
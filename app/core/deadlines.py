@@ -0,0 +1,101 @@
+"""Per-request deadlines, enforced in the app and pushed down to Postgres.
+
+Routes on a router built with `route_class=DeadlineRoute` run under
+`asyncio.timeout(REQUEST_TIMEOUT_SECONDS)`, or the value set with the
+`deadline()` decorator. The absolute deadline lives in a contextvar so the
+DB layer can turn the time left into `SET LOCAL statement_timeout` when a
+transaction begins: a runaway query is cancelled by Postgres itself and its
+connection goes straight back to the pool. AUTOCOMMIT reads have no
+transaction to scope the setting to; for those, cancelling the asyncio task
+makes asyncpg send a server-side cancel.
+
+An expired deadline is answered with 504.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+from fastapi import Request, Response
+from sqlalchemy.exc import DBAPIError
+
+from app.config import get_settings
+from app.core.exceptions import AppException
+from app.core.timing import TimedRoute
+
+settings = get_settings()
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+_UNSET = object()
+
+# Absolute `loop.time()` by which the current request must finish.
+_DEADLINE: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+# SQLSTATE for "canceling statement due to statement timeout / user request".
+_QUERY_CANCELED = "57014"
+
+
+class DeadlineExceededException(AppException):
+    def __init__(self, detail: str = "Request deadline exceeded"):
+        super().__init__(status_code=504, detail=detail)
+
+
+def deadline(seconds: float | None) -> Callable[[_F], _F]:
+    """Override the request deadline for one endpoint (`None` disables it)."""
+
+    def decorator(endpoint: _F) -> _F:
+        endpoint.__request_deadline__ = seconds  # type: ignore[attr-defined]
+        return endpoint
+
+    return decorator
+
+
+def remaining_seconds() -> float | None:
+    """Time left before the current request's deadline, if it has one."""
+    expires_at = _DEADLINE.get()
+    if expires_at is None:
+        return None
+    return expires_at - asyncio.get_running_loop().time()
+
+
+def statement_timeout_ms() -> int | None:
+    """Value for `SET LOCAL statement_timeout` matching the time left."""
+    remaining = remaining_seconds()
+    if remaining is None:
+        return None
+    return max(1, int(remaining * 1000))
+
+
+class DeadlineRoute(TimedRoute):
+    """TimedRoute that runs the whole handler (dependencies included) under
+    the route's deadline."""
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        handler = super().get_route_handler()
+        seconds = getattr(self.endpoint, "__request_deadline__", _UNSET)
+        if seconds is _UNSET:
+            seconds = settings.REQUEST_TIMEOUT_SECONDS
+        if not seconds:
+            return handler
+
+        async def deadline_handler(request: Request) -> Response:
+            expires_at = asyncio.get_running_loop().time() + seconds
+            token = _DEADLINE.set(expires_at)
+            try:
+                async with asyncio.timeout_at(expires_at) as timeout:
+                    return await handler(request)
+            except TimeoutError:
+                if timeout.expired():
+                    raise DeadlineExceededException() from None
+                raise
+            except DBAPIError as exc:
+                if getattr(exc.orig, "sqlstate", None) == _QUERY_CANCELED:
+                    raise DeadlineExceededException() from exc
+                raise
+            finally:
+                _DEADLINE.reset(token)
+
+        return deadline_handler
@@ -7,7 +7,10 @@ import logging
 
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
+from app.core.admission import busy_response
 from app.utils.response import error_response
 
 logger = logging.getLogger(__name__)
@@ -42,6 +45,10 @@ class ConflictException(AppException):
         super().__init__(status_code=409, detail=detail)
 
 
+# SQLSTATE for unique_violation.
+_UNIQUE_VIOLATION = "23505"
+
+
 # ── Register handlers on the app ─────────────────────────
 def register_exception_handlers(app: FastAPI) -> None:
     @app.exception_handler(AppException)
@@ -56,6 +63,36 @@ def register_exception_handlers(app: FastAPI) -> None:
             ),
         )
 
+    @app.exception_handler(PoolTimeoutError)
+    async def pool_timeout_handler(
+        request: Request, exc: PoolTimeoutError
+    ) -> JSONResponse:
+        # No pooled DB connection freed up within DB_POOL_TIMEOUT.
+        logger.warning("DB pool timeout on %s %s", request.method, request.url)
+        return busy_response()
+
+    @app.exception_handler(IntegrityError)
+    async def integrity_error_handler(
+        request: Request, exc: IntegrityError
+    ) -> JSONResponse:
+        # e.g. creating an item with an external_id that is already taken.
+        if getattr(exc.orig, "sqlstate", None) == _UNIQUE_VIOLATION:
+            return JSONResponse(
+                status_code=409,
+                content=error_response(
+                    message="Conflicts with an existing record",
+                    response_code=409,
+                ),
+            )
+        logger.exception("Integrity error on %s %s", request.method, request.url)
+        return JSONResponse(
+            status_code=500,
+            content=error_response(
+                message="Internal server error",
+                response_code=500,
+            ),
+        )
+
     @app.exception_handler(Exception)
     async def unhandled_exception_handler(
         request: Request, exc: Exception
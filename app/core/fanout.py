@@ -0,0 +1,99 @@
+"""In-process fan-out of events to streaming clients (SSE).
+
+One `Fanout` per event type is fed by the worker's single LISTEN connection
+(`app.core.pg_listener`) and copies every event into a bounded queue per
+subscriber. Publishing never waits: a subscriber whose queue is full is
+dropped – its stream ends with a `dropped` event so the client reconnects
+and resyncs – instead of slowing everyone else down.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+from app.core.exceptions import AppException
+
+
+class Subscription:
+    def __init__(self, queue_size: int) -> None:
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(queue_size)
+        self.dropped = asyncio.Event()
+
+
+class Fanout:
+    def __init__(self, name: str, *, queue_size: int, max_subscribers: int) -> None:
+        self.name = name
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: set[Subscription] = set()
+        self.published = 0
+        self.dropped = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+    def subscribe(self) -> Subscription:
+        if len(self._subscribers) >= self.max_subscribers:
+            raise AppException(status_code=503, detail="Too many stream subscribers")
+        subscription = Subscription(self.queue_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def publish(self, event: dict[str, Any]) -> None:
+        self.published += 1
+        for subscription in list(self._subscribers):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                self._subscribers.discard(subscription)
+                subscription.dropped.set()
+
+    async def publish_async(self, event: dict[str, Any]) -> None:
+        """`publish` as a notification handler."""
+        self.publish(event)
+
+
+def _sse(event: str, data: Any) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+async def sse_stream(
+    fanout: Fanout, subscription: Subscription, *, event: str, heartbeat: float
+) -> AsyncIterator[bytes]:
+    """Server-sent events for `subscription`, with a comment line every
+    `heartbeat` seconds so proxies keep idle connections open."""
+    dropped = asyncio.create_task(subscription.dropped.wait())
+    getter: asyncio.Task | None = None
+    try:
+        yield b"retry: 5000\n\n"
+        while True:
+            getter = asyncio.create_task(subscription.queue.get())
+            done, _ = await asyncio.wait(
+                {getter, dropped},
+                timeout=heartbeat,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if dropped in done:
+                yield _sse("dropped", {"reason": "client too slow"})
+                return
+            if getter in done:
+                yield _sse(event, getter.result())
+                continue
+            getter.cancel()
+            yield b": keep-alive\n\n"
+    finally:
+        dropped.cancel()
+        if getter is not None:
+            getter.cancel()
+        fanout.unsubscribe(subscription)
@@ -0,0 +1,351 @@
+"""Idempotency-Key support for POST endpoints.
+
+A client that retries a POST after a timeout sends the same `Idempotency-Key`
+header. The first request with a key claims it; when it finishes, its
+response (status, content type, body) is stored for
+`IDEMPOTENCY_TTL_SECONDS`. Retries are answered from storage – with an
+`Idempotent-Replayed: true` header – without running the endpoint again, and
+a retry that arrives while the original is still running waits for it.
+Keys are scoped per user, and reusing a key for a different request (method,
+path, query or body) is rejected with 422.
+
+Endpoints opt in with the `idempotency_key` dependency (`app.api.deps`) on a
+router built with `route_class=IdempotentRoute`. Only final responses are
+stored: on an exception or a 5xx the claim is released so the retry runs.
+
+`IDEMPOTENCY_BACKEND` selects the storage:
+
+- `memory`   – per-process; only dedupes retries that reach the same worker.
+- `postgres` – the `idempotency_keys` table, shared by every worker and
+  instance. A claim whose request died is taken over after
+  `IDEMPOTENCY_LEASE_SECONDS`. The store has its own small pool
+  (`IDEMPOTENCY_DB_POOL_SIZE`): the request already holds a connection from
+  the request pool when it claims its key, so claims taken from that pool
+  could deadlock a saturated one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Request, Response
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.config import get_settings
+from app.core.deadlines import DeadlineRoute
+from app.core.exceptions import AppException, ConflictException
+from app.models.idempotency import IdempotencyKey
+from app.utils.db import get_asyncpg_connect_args, install_pooler_fallback
+
+settings = get_settings()
+
+# request.state attribute holding (key, fingerprint) of a claimed key.
+_STATE_KEY = "idempotency_key"
+# Postgres store: prune expired rows once every this many claims.
+_PRUNE_EVERY = 100
+
+
+@dataclass(frozen=True)
+class IdempotencyRecord:
+    fingerprint: str
+    status_code: int | None = None  # None while the original is in flight
+    content_type: str | None = None
+    body: bytes | None = None
+
+    @property
+    def completed(self) -> bool:
+        return self.status_code is not None
+
+
+class IdempotentReplay(Exception):
+    """Raised by the dependency to short-circuit the endpoint with a stored
+    response; turned into that response by `IdempotentRoute`."""
+
+    def __init__(self, record: IdempotencyRecord) -> None:
+        self.record = record
+
+    def response(self) -> Response:
+        return Response(
+            content=self.record.body,
+            status_code=self.record.status_code,
+            media_type=self.record.content_type,
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+
+class IdempotencyStore(ABC):
+    @abstractmethod
+    async def claim(
+        self, key: str, fingerprint: str, lease: float
+    ) -> IdempotencyRecord | None:
+        """Claim `key` for `lease` seconds: None if claimed, else the
+        existing (pending or completed) record."""
+
+    @abstractmethod
+    async def get(self, key: str) -> IdempotencyRecord | None: ...
+
+    @abstractmethod
+    async def complete(
+        self, key: str, record: IdempotencyRecord, ttl: float
+    ) -> None: ...
+
+    @abstractmethod
+    async def release(self, key: str) -> None: ...
+
+    async def wait(self, key: str, timeout: float) -> None:
+        """Return once `key` is no longer pending (or after `timeout`)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            record = await self.get(key)
+            if record is None or record.completed:
+                return
+            await asyncio.sleep(0.1)
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self.max_entries = max_entries
+        self._records: OrderedDict[str, tuple[float, IdempotencyRecord]] = OrderedDict()
+        self._finished: dict[str, asyncio.Event] = {}
+
+    async def get(self, key: str) -> IdempotencyRecord | None:
+        entry = self._records.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    async def claim(
+        self, key: str, fingerprint: str, lease: float
+    ) -> IdempotencyRecord | None:
+        existing = await self.get(key)
+        if existing is not None:
+            return existing
+        self._records[key] = (time.monotonic() + lease, IdempotencyRecord(fingerprint))
+        self._records.move_to_end(key)
+        self._finished[key] = asyncio.Event()
+        while len(self._records) > self.max_entries:
+            self._records.popitem(last=False)
+        return None
+
+    async def complete(self, key: str, record: IdempotencyRecord, ttl: float) -> None:
+        self._records[key] = (time.monotonic() + ttl, record)
+        self._wake(key)
+
+    async def release(self, key: str) -> None:
+        self._records.pop(key, None)
+        self._wake(key)
+
+    async def wait(self, key: str, timeout: float) -> None:
+        finished = self._finished.get(key)
+        if finished is not None:
+            try:
+                await asyncio.wait_for(finished.wait(), timeout)
+            except TimeoutError:
+                pass
+
+    def _wake(self, key: str) -> None:
+        finished = self._finished.pop(key, None)
+        if finished is not None:
+            finished.set()
+
+
+class PostgresIdempotencyStore(IdempotencyStore):
+    """`idempotency_keys` rows, written outside the request's transaction so
+    other workers see a claim immediately."""
+
+    def __init__(self) -> None:
+        self._claims = 0
+        self._engine: AsyncEngine | None = None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if self._engine is None:
+            self._engine = create_async_engine(
+                settings.DATABASE_URL,
+                connect_args=get_asyncpg_connect_args(settings.DATABASE_URL),
+                pool_size=settings.IDEMPOTENCY_DB_POOL_SIZE,
+                max_overflow=0,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                pool_recycle=settings.DB_POOL_RECYCLE,
+                pool_pre_ping=True,
+            )
+            install_pooler_fallback(self._engine, settings.DATABASE_URL)
+        return self._engine
+
+    async def dispose(self) -> None:
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+
+    async def get(self, key: str) -> IdempotencyRecord | None:
+        async with self.engine.connect() as conn:
+            row = (
+                await conn.execute(
+                    select(
+                        IdempotencyKey.fingerprint,
+                        IdempotencyKey.status_code,
+                        IdempotencyKey.content_type,
+                        IdempotencyKey.body,
+                    ).where(
+                        IdempotencyKey.key == key,
+                        IdempotencyKey.expires_at > func.now(),
+                    )
+                )
+            ).first()
+        return IdempotencyRecord(*row) if row is not None else None
+
+    async def claim(
+        self, key: str, fingerprint: str, lease: float
+    ) -> IdempotencyRecord | None:
+        expires_at = func.now() + timedelta(seconds=lease)
+        statement = (
+            insert(IdempotencyKey)
+            .values(key=key, fingerprint=fingerprint, expires_at=expires_at)
+            # An expired row (finished long ago, or its request died) is
+            # taken over; a live one is left alone.
+            .on_conflict_do_update(
+                index_elements=[IdempotencyKey.key],
+                set_={
+                    "fingerprint": fingerprint,
+                    "status_code": None,
+                    "content_type": None,
+                    "body": None,
+                    "created_at": func.now(),
+                    "expires_at": expires_at,
+                },
+                where=IdempotencyKey.expires_at <= func.now(),
+            )
+            .returning(IdempotencyKey.key)
+        )
+        while True:
+            async with self.engine.begin() as conn:
+                claimed = (await conn.execute(statement)).first() is not None
+                self._claims += 1
+                if self._claims % _PRUNE_EVERY == 0:
+                    await conn.execute(
+                        delete(IdempotencyKey).where(
+                            IdempotencyKey.expires_at <= func.now()
+                        )
+                    )
+            if claimed:
+                return None
+            existing = await self.get(key)
+            if existing is not None:
+                return existing
+            # It expired between the two statements: try to claim again.
+
+    async def complete(self, key: str, record: IdempotencyRecord, ttl: float) -> None:
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                IdempotencyKey.__table__.update()
+                .where(IdempotencyKey.key == key)
+                .values(
+                    status_code=record.status_code,
+                    content_type=record.content_type,
+                    body=record.body,
+                    expires_at=func.now() + timedelta(seconds=ttl),
+                )
+            )
+
+    async def release(self, key: str) -> None:
+        async with self.engine.begin() as conn:
+            await conn.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key))
+
+
+@lru_cache
+def get_idempotency_store() -> IdempotencyStore:
+    """Process-wide store selected by `IDEMPOTENCY_BACKEND`."""
+    if settings.IDEMPOTENCY_BACKEND == "postgres":
+        return PostgresIdempotencyStore()
+    return MemoryIdempotencyStore(settings.CACHE_MAX_ENTRIES)
+
+
+async def close_idempotency_store() -> None:
+    """Dispose the Postgres store's pool (shutdown)."""
+    store = get_idempotency_store()
+    if isinstance(store, PostgresIdempotencyStore):
+        await store.dispose()
+
+
+async def _fingerprint(request: Request) -> str:
+    digest = hashlib.sha256(
+        f"{request.method} {request.url.path}?{request.url.query}\n".encode()
+    )
+    digest.update(await request.body())
+    return digest.hexdigest()
+
+
+async def begin_idempotent_request(request: Request, key: str) -> None:
+    """Claim `key` for this request, or raise `IdempotentReplay` with the
+    stored response – waiting first if the original is still running."""
+    store = get_idempotency_store()
+    fingerprint = await _fingerprint(request)
+    lease = settings.IDEMPOTENCY_LEASE_SECONDS
+    give_up_at = time.monotonic() + lease
+    while True:
+        record = await store.claim(key, fingerprint, lease)
+        if record is None:
+            setattr(request.state, _STATE_KEY, (key, fingerprint))
+            return
+        if record.fingerprint != fingerprint:
+            raise AppException(
+                status_code=422,
+                detail="Idempotency-Key was already used for a different request",
+            )
+        if record.completed:
+            raise IdempotentReplay(record)
+        remaining = give_up_at - time.monotonic()
+        if remaining <= 0:
+            raise ConflictException(
+                "A request with this Idempotency-Key is still in progress"
+            )
+        await store.wait(key, remaining)
+
+
+class IdempotentRoute(DeadlineRoute):
+    """DeadlineRoute that stores the response of requests that claimed an
+    Idempotency-Key and serves `IdempotentReplay`s."""
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        handler = super().get_route_handler()
+
+        async def idempotent_handler(request: Request) -> Response:
+            try:
+                response = await handler(request)
+            except IdempotentReplay as replay:
+                return replay.response()
+            except BaseException:
+                claimed = getattr(request.state, _STATE_KEY, None)
+                if claimed is not None:
+                    await get_idempotency_store().release(claimed[0])
+                raise
+
+            claimed = getattr(request.state, _STATE_KEY, None)
+            if claimed is not None:
+                key, fingerprint = claimed
+                store = get_idempotency_store()
+                body = getattr(response, "body", None)  # None when streamed
+                if response.status_code >= 500 or body is None:
+                    await store.release(key)
+                else:
+                    record = IdempotencyRecord(
+                        fingerprint=fingerprint,
+                        status_code=response.status_code,
+                        content_type=response.headers.get("content-type"),
+                        body=bytes(body),
+                    )
+                    await store.complete(key, record, settings.IDEMPOTENCY_TTL_SECONDS)
+            return response
+
+        return idempotent_handler
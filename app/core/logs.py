@@ -0,0 +1,235 @@
+"""Non-blocking, structured logging.
+
+Everything logged in a worker – app loggers, uvicorn, gunicorn's worker
+messages and the in-app access log – goes through one `QueueHandler` on the
+root logger. Emitting a record only formats its message and puts it on a
+bounded queue; a `QueueListener` thread does the actual writing to stdout.
+A slow log consumer (Docker's json-file driver, Render's collector) can
+therefore never stall the event loop. When the queue is full, records are
+dropped and counted (`/api/v1/health` → `logging`) rather than waited on.
+
+Lines are JSON objects (`LOG_FORMAT=json`) with the level, logger, message,
+the request id of the request that emitted them, any `extra={...}` fields and
+the formatted exception. `LOG_FORMAT=text` is easier to read locally.
+
+`AccessLogMiddleware` replaces gunicorn's `--access-logfile`: one line per
+request on the `app.access` logger, with method, path, status, duration and
+client. It assigns the request id (or keeps a sane incoming `X-Request-ID`)
+and echoes it in the response. Successful, fast requests are sampled at
+`ACCESS_LOG_SAMPLE_RATE`; errors and requests slower than
+`ACCESS_LOG_SLOW_SECONDS` are always logged.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from logging.handlers import QueueHandler, QueueListener
+from time import perf_counter
+from typing import Any
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+
+settings = get_settings()
+access_logger = logging.getLogger("app.access")
+
+_REQUEST_ID: ContextVar[str | None] = ContextVar("request_id", default=None)
+# Incoming X-Request-ID values are kept only if they look like an id.
+_VALID_REQUEST_ID = re.compile(r"[\w.:-]{1,128}")
+
+# Attributes every LogRecord has; anything else came from `extra=` (except
+# uvicorn's ANSI-coloured duplicate of the message).
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {
+    "message",
+    "asctime",
+    "request_id",
+    "color_message",
+}
+
+# Loggers that install their own (synchronous) handlers; rerouted to root.
+_REROUTED = ("uvicorn", "uvicorn.error", "gunicorn.error")
+
+_STATS: dict[str, Any] = {"dropped": 0}
+_listener: QueueListener | None = None
+
+
+def current_request_id() -> str | None:
+    return _REQUEST_ID.get()
+
+
+def logging_status() -> dict[str, Any]:
+    queue_ = _listener.queue if _listener is not None else None
+    return {
+        "enabled": _listener is not None,
+        "queued": queue_.qsize() if queue_ is not None else 0,
+        "dropped": _STATS["dropped"],
+    }
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, UTC).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id is not None:
+            entry["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, default=str)
+
+
+class _RequestIdFilter(logging.Filter):
+    """Stamps records with the request id – in the emitting context, before
+    they cross to the listener thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = _REQUEST_ID.get()
+        if request_id is not None:
+            record.request_id = request_id
+        return True
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve everything that can't cross threads (args, the traceback
+        # object) but leave the final formatting to the listener.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _STATS["dropped"] += 1
+
+
+def _formatter() -> logging.Formatter:
+    if settings.LOG_FORMAT == "text":
+        return logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s",
+            defaults={"request_id": "-"},
+        )
+    return JsonFormatter()
+
+
+def configure_logging() -> None:
+    """Route the process' logging through the queue (once per worker)."""
+    global _listener
+    if _listener is not None:
+        return
+    log_queue: queue.Queue[logging.LogRecord] = queue.Queue(settings.LOG_QUEUE_MAX_SIZE)
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(_formatter())
+    handler = _NonBlockingQueueHandler(log_queue)
+    handler.addFilter(_RequestIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name in _REROUTED:
+        logger = logging.getLogger(name)
+        logger.handlers = []
+        logger.propagate = True
+    # Replaced by AccessLogMiddleware.
+    logging.getLogger("uvicorn.access").disabled = True
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Flush the queue and write synchronously from here on (shutdown)."""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    try:
+        listener.stop()
+    except queue.Full:
+        pass
+    logging.getLogger().handlers = list(listener.handlers)
+
+
+class AccessLogMiddleware:
+    """Pure ASGI middleware – request ids and one access line per request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                incoming = value.decode("latin-1")
+                if _VALID_REQUEST_ID.fullmatch(incoming):
+                    request_id = incoming
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = _REQUEST_ID.set(request_id)
+        status = 500
+        start = perf_counter()
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            duration = perf_counter() - start
+            if (
+                status >= 400
+                or duration >= settings.ACCESS_LOG_SLOW_SECONDS
+                or random.random() < settings.ACCESS_LOG_SAMPLE_RATE
+            ):
+                client = scope.get("client")
+                access_logger.info(
+                    "%s %s %d",
+                    scope["method"],
+                    scope["path"],
+                    status,
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status,
+                        "duration_ms": round(duration * 1000, 2),
+                        "client": client[0] if client else None,
+                    },
+                )
+            _REQUEST_ID.reset(token)
@@ -0,0 +1,132 @@
+"""Event-loop lag monitor with a blocked-loop watchdog.
+
+Synchronous work on the event loop (JWT signature checks, big Pydantic
+validations, logging to a slow sink, ...) delays every other request on the
+worker. `monitor_loop_forever()` sleeps for `LOOP_MONITOR_INTERVAL_SECONDS`
+at a time and records how late each wake-up is – the scheduling lag every
+coroutine saw at that moment – in a histogram reported by `/api/v1/health`.
+
+The sampler can't observe a stall while it is happening, so a daemon thread
+watches its heartbeat. When the loop has been stuck for longer than
+`LOOP_BLOCK_THRESHOLD_SECONDS`, the thread logs the stack of the loop thread
+– the code that is blocking it – and the name of the running task, once per
+stall. Both sides wake up a few times per second at most, so the monitor is
+cheap enough to leave on in production (unlike asyncio debug mode).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Any
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Histogram bucket upper bounds, in milliseconds.
+_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_STATS: dict[str, Any] = {
+    "enabled": False,
+    "samples": 0,
+    "sum_ms": 0.0,
+    "max_ms": 0.0,
+    "last_ms": 0.0,
+    "blocked": 0,
+    "counts": [0] * (len(_BUCKETS_MS) + 1),
+}
+
+
+def loop_lag_status() -> dict[str, Any]:
+    """Lag histogram with cumulative (`le`) buckets, like a Prometheus one."""
+    cumulative, buckets = 0, {}
+    for bound, count in zip((*map(str, _BUCKETS_MS), "+Inf"), _STATS["counts"]):
+        cumulative += count
+        buckets[bound] = cumulative
+    return {
+        "enabled": _STATS["enabled"],
+        "samples": _STATS["samples"],
+        "sum_ms": round(_STATS["sum_ms"], 3),
+        "max_ms": round(_STATS["max_ms"], 3),
+        "last_ms": round(_STATS["last_ms"], 3),
+        "blocked": _STATS["blocked"],
+        "buckets_ms": buckets,
+    }
+
+
+def _record(lag_ms: float) -> None:
+    _STATS["samples"] += 1
+    _STATS["sum_ms"] += lag_ms
+    _STATS["last_ms"] = lag_ms
+    _STATS["max_ms"] = max(_STATS["max_ms"], lag_ms)
+    for index, bound in enumerate(_BUCKETS_MS):
+        if lag_ms <= bound:
+            _STATS["counts"][index] += 1
+            return
+    _STATS["counts"][-1] += 1
+
+
+class _Watchdog(threading.Thread):
+    """Logs the loop thread's stack when the sampler's heartbeat is late."""
+
+    def __init__(
+        self, loop: asyncio.AbstractEventLoop, interval: float, threshold: float
+    ) -> None:
+        super().__init__(name="loop-watchdog", daemon=True)
+        self.loop = loop
+        self.loop_thread_id = threading.get_ident()
+        self.interval = interval
+        self.threshold = threshold
+        self.heartbeat = time.monotonic()
+        self._reported_beat = 0.0
+        self._stopped = threading.Event()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.threshold / 2):
+            beat = self.heartbeat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled > self.threshold and beat != self._reported_beat:
+                self._reported_beat = beat
+                self._report(stalled)
+
+    def _report(self, stalled: float) -> None:
+        frame = sys._current_frames().get(self.loop_thread_id)
+        if frame is None:
+            return
+        task = asyncio.current_task(self.loop)
+        _STATS["blocked"] += 1
+        logger.warning(
+            "Event loop blocked for %.0f ms so far (task %s); loop thread stack:\n%s",
+            stalled * 1000,
+            task.get_name() if task is not None else "-",
+            "".join(traceback.format_stack(frame)),
+        )
+
+
+async def monitor_loop_forever() -> None:
+    """Sample event-loop lag for the life of the worker (lifespan task)."""
+    if not settings.LOOP_MONITOR_ENABLED:
+        return
+    interval = settings.LOOP_MONITOR_INTERVAL_SECONDS
+    loop = asyncio.get_running_loop()
+    watchdog = _Watchdog(loop, interval, settings.LOOP_BLOCK_THRESHOLD_SECONDS)
+    watchdog.start()
+    _STATS["enabled"] = True
+    try:
+        while True:
+            started = loop.time()
+            watchdog.heartbeat = time.monotonic()
+            await asyncio.sleep(interval)
+            _record(max(0.0, loop.time() - started - interval) * 1000)
+    finally:
+        _STATS["enabled"] = False
+        watchdog.stop()
@@ -0,0 +1,220 @@
+"""Cross-worker messages over Postgres LISTEN/NOTIFY.
+
+Each worker keeps one dedicated asyncpg connection – never one from the
+request pool – that LISTENs on the configured channels and dispatches every
+notification to the handlers registered for its channel. The connection is
+re-opened with backoff whenever it drops; since notifications sent while it
+was down are lost, the reconnect handlers run on every (re)connect – the
+cache one drops every registered cache.
+
+Cache invalidation: `publish_invalidations()` turns the invalidations a
+request session collected into `pg_notify()` calls inside the same
+transaction, so Postgres delivers them only if (and when) it commits. Every
+other worker – on this instance or another one – then replays them through
+`app.core.query_cache.invalidate()`. The sending worker applies its own
+invalidations directly after the commit and ignores its own messages.
+
+LISTEN needs a session-level connection: a transaction-mode pooler (e.g.
+Supabase on :6543) cannot deliver notifications, so point
+`DATABASE_LISTEN_URL` at a direct connection. Without one the listener stays
+off and caches fall back to their TTLs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+from uuid import uuid4
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.query_cache import invalidate, invalidate_all, pending_invalidations
+from app.utils.db import get_raw_asyncpg_connect_args, is_transaction_pooler
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+NotificationHandler = Callable[[dict[str, Any]], Awaitable[None]]
+
+# Identifies this worker in its own notifications.
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+# NOTIFY payloads are limited to 8000 bytes; larger key sets become "all".
+_MAX_PAYLOAD = 7900
+
+_HANDLERS: dict[str, list[NotificationHandler]] = {}
+_RECONNECT_HANDLERS: list[Callable[[], Awaitable[None]]] = []
+_LISTENER: dict[str, Any] = {
+    "enabled": False,
+    "connected": False,
+    "connects": 0,
+    "received": 0,
+    "last_error": None,
+    "connected_at": None,
+}
+
+
+def listener_status() -> dict[str, Any]:
+    return dict(_LISTENER)
+
+
+def listen_url() -> str | None:
+    """Direct-connection URL for LISTEN, or None if only a pooler is known."""
+    url = (
+        settings.DATABASE_LISTEN_URL
+        or settings.ALEMBIC_DATABASE_URL
+        or settings.DATABASE_URL
+    )
+    if not settings.DATABASE_LISTEN_URL and is_transaction_pooler(url):
+        return None
+    return url
+
+
+def add_handler(channel: str, handler: NotificationHandler) -> None:
+    """Call `handler(payload)` for every JSON notification on `channel`."""
+    _HANDLERS.setdefault(channel, []).append(handler)
+
+
+def add_reconnect_handler(handler: Callable[[], Awaitable[None]]) -> None:
+    """Call `handler()` on every (re)connect – notifications may have been missed."""
+    _RECONNECT_HANDLERS.append(handler)
+
+
+async def notify(session: AsyncSession, channel: str, payload: dict[str, Any]) -> None:
+    """Queue a notification in `session`'s transaction (sent on commit).
+
+    Payloads are tagged with this worker's id, so handlers can tell their
+    own messages apart.
+    """
+    await session.execute(
+        select(func.pg_notify(channel, json.dumps({**payload, "origin": WORKER_ID})))
+    )
+
+
+# ── Cache invalidation ───────────────────────────────────
+async def publish_invalidations(session: AsyncSession) -> None:
+    """Broadcast the session's pending cache invalidations (call before commit)."""
+    if not settings.PG_NOTIFY_ENABLED:
+        return
+    for name, keys in pending_invalidations(session).items():
+        payload: dict[str, Any] = {
+            "cache": name,
+            "keys": None if keys is None else sorted(keys),
+        }
+        if len(json.dumps(payload)) > _MAX_PAYLOAD:
+            payload["keys"] = None
+        await notify(session, settings.PG_NOTIFY_CHANNEL, payload)
+
+
+async def _on_invalidation(payload: dict[str, Any]) -> None:
+    if payload.get("origin") == WORKER_ID:
+        return  # already applied locally after the commit
+    keys = payload.get("keys")
+    await invalidate(payload["cache"], None if keys is None else set(keys))
+
+
+add_handler(settings.PG_NOTIFY_CHANNEL, _on_invalidation)
+add_reconnect_handler(invalidate_all)
+
+
+# ── Listener ─────────────────────────────────────────────
+async def _dispatch(channel: str, raw: str) -> None:
+    _LISTENER["received"] += 1
+    try:
+        payload = json.loads(raw)
+    except ValueError:
+        logger.warning("Ignoring non-JSON notification on %s", channel)
+        return
+    for handler in _HANDLERS.get(channel, []):
+        try:
+            await handler(payload)
+        except Exception:
+            logger.exception("Notification handler failed on %s", channel)
+
+
+async def _listen_once(url: str) -> None:
+    dsn = url.replace("postgresql+asyncpg://", "postgresql://", 1)
+    conn = await asyncpg.connect(dsn, **get_raw_asyncpg_connect_args(url))
+    lost = asyncio.Event()
+    # Handlers run sequentially in arrival order, off asyncpg's callback.
+    queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+
+    def on_notification(_conn, _pid, channel: str, payload: str) -> None:
+        queue.put_nowait((channel, payload))
+
+    async def consume() -> None:
+        while True:
+            channel, payload = await queue.get()
+            await _dispatch(channel, payload)
+
+    conn.add_termination_listener(lambda _conn: lost.set())
+    consumer = asyncio.create_task(consume())
+    try:
+        for channel in _HANDLERS:
+            await conn.add_listener(channel, on_notification)
+        _LISTENER.update(connected=True, connected_at=time.time(), last_error=None)
+        _LISTENER["connects"] += 1
+        for handler in _RECONNECT_HANDLERS:
+            await handler()
+
+        while not lost.is_set():
+            # A periodic round-trip detects half-open TCP connections that
+            # would otherwise never report termination.
+            try:
+                await asyncio.wait_for(
+                    lost.wait(), settings.PG_LISTEN_KEEPALIVE_SECONDS
+                )
+            except TimeoutError:
+                await conn.fetchval(
+                    "SELECT 1", timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS
+                )
+    finally:
+        _LISTENER["connected"] = False
+        consumer.cancel()
+        if not conn.is_closed():
+            await conn.close(timeout=2)
+
+
+async def listen_forever(
+    *, retry_delay: float = 1.0, max_retry_delay: float = 30.0
+) -> None:
+    """Keep the LISTEN connection open for the life of the worker."""
+    url = listen_url()
+    if not settings.PG_NOTIFY_ENABLED or url is None:
+        if settings.PG_NOTIFY_ENABLED:
+            logger.warning(
+                "DATABASE_URL is a transaction pooler and DATABASE_LISTEN_URL is "
+                "not set; cross-worker cache invalidation is disabled"
+            )
+        return
+
+    _LISTENER["enabled"] = True
+    delay = retry_delay
+    while True:
+        started = time.monotonic()
+        try:
+            await _listen_once(url)
+            error = "connection lost"
+        except (asyncpg.PostgresError, asyncpg.InterfaceError, OSError) as exc:
+            error = f"{type(exc).__name__}: {exc}"
+        # Anything else (e.g. a failing reconnect handler) is a bug, but
+        # giving up would silently stop cross-worker invalidation.
+        except Exception as exc:
+            logger.exception("LISTEN connection failed")
+            error = f"{type(exc).__name__}: {exc}"
+        _LISTENER["last_error"] = error
+        if time.monotonic() - started > max_retry_delay:
+            delay = retry_delay  # it was up for a while; start backoff over
+        logger.warning(
+            "LISTEN connection down (%s); reconnecting in %.0fs", error, delay
+        )
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_retry_delay)
@@ -0,0 +1,244 @@
+"""On-demand profiling of single requests (never installed in prod).
+
+A request carrying a signed token – `X-Profile: <token>` header or
+`?_profile=<token>` – is profiled end to end, through every middleware. The
+response gets an `X-Profile-Artifact: <name>` header and the artifact is
+written to `PROFILING_OUTPUT_DIR` once the response has been sent. Fetch it
+with `GET /_profiles/<name>`, which needs a token for that path.
+
+Tokens are minted with `python -m app.tools.profile_token <path>`. Each one is
+bound to a path, an artifact format and an expiry, and signed with
+`PROFILING_SECRET`:
+
+- `pstats`    – cProfile, every call with exact counts (`snakeviz`,
+  `python -m pstats`). It profiles the whole loop thread, so concurrent
+  requests on the worker show up too – use a quiet instance.
+- `collapsed` – a stack sampler thread (`PROFILING_SAMPLE_INTERVAL_SECONDS`)
+  that only counts samples while this request's task runs; time spent
+  awaiting I/O is counted as `(awaiting)`. Feed it to flamegraph.pl or
+  speedscope.
+
+One request per worker is profiled at a time. The middleware is only added
+when `ENVIRONMENT != prod` and `PROFILING_SECRET` is set, so other deployments
+pay nothing; where it is installed, unprofiled requests cost a header lookup.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import hashlib
+import hmac
+import logging
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from fastapi.responses import FileResponse, JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+from app.utils.response import error_response
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+FORMATS = {"pstats": ".pstats", "collapsed": ".collapsed.txt"}
+ARTIFACT_PREFIX = "/_profiles/"
+_ARTIFACT_NAME = re.compile(r"^[\w.-]+\.(pstats|collapsed\.txt)$")
+
+_active = False
+
+
+def output_dir() -> Path:
+    if settings.PROFILING_OUTPUT_DIR:
+        return Path(settings.PROFILING_OUTPUT_DIR)
+    return Path(tempfile.gettempdir()) / "request-profiles"
+
+
+def _signature(fmt: str, expires: int, path: str) -> str:
+    message = f"{fmt}:{expires}:{path}".encode()
+    return hmac.new(
+        settings.PROFILING_SECRET.encode(), message, hashlib.sha256
+    ).hexdigest()
+
+
+def make_token(path: str, fmt: str = "pstats", ttl: float = 3600) -> str:
+    """`<format>.<expires>.<signature>`, valid for requests to `path`."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown profile format {fmt!r}")
+    expires = int(time.time() + ttl)
+    return f"{fmt}.{expires}.{_signature(fmt, expires, path)}"
+
+
+def verify_token(token: str, path: str) -> str | None:
+    """The token's format if it is valid for `path`, else None."""
+    try:
+        fmt, expires_text, signature = token.split(".")
+        expires = int(expires_text)
+    except ValueError:
+        return None
+    if fmt not in FORMATS or expires < time.time():
+        return None
+    if not hmac.compare_digest(signature, _signature(fmt, expires, path)):
+        return None
+    return fmt
+
+
+def _requested_token(scope: Scope) -> str | None:
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            return value.decode("latin-1")
+    query = scope.get("query_string", b"")
+    if b"_profile=" in query:
+        values = parse_qs(query.decode("latin-1")).get("_profile")
+        return values[0] if values else None
+    return None
+
+
+def _refusal(status_code: int, message: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content=error_response(message=message, response_code=status_code),
+    )
+
+
+def _artifact_name(scope: Scope, fmt: str) -> str:
+    slug = re.sub(r"[^\w]+", "-", scope["path"]).strip("-") or "root"
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    return f"{stamp}-{scope['method']}-{slug[:60]}-{uuid.uuid4().hex[:8]}{FORMATS[fmt]}"
+
+
+class _StackSampler(threading.Thread):
+    """Counts the loop thread's stacks while `task` is the running task."""
+
+    def __init__(self, task: asyncio.Task, interval: float) -> None:
+        super().__init__(name="request-profiler", daemon=True)
+        self.task = task
+        self.loop = task.get_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stopped = threading.Event()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            if asyncio.current_task(self.loop) is not self.task:
+                self.stacks["(awaiting)"] += 1
+                continue
+            frame = sys._current_frames().get(self.loop_thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                filename = Path(code.co_filename).name
+                frames.append(f"{code.co_qualname} ({filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(frames))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+
+def _prune_artifacts(directory: Path) -> None:
+    artifacts = sorted(directory.iterdir(), key=lambda path: path.stat().st_mtime)
+    for path in artifacts[: max(0, len(artifacts) - settings.PROFILING_MAX_ARTIFACTS)]:
+        path.unlink(missing_ok=True)
+
+
+def _write_artifact(
+    name: str, profiler: cProfile.Profile | None, sampler: _StackSampler | None
+) -> None:
+    directory = output_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    if profiler is not None:
+        profiler.dump_stats(directory / name)
+    elif sampler is not None:
+        (directory / name).write_text(sampler.collapsed(), encoding="utf-8")
+    _prune_artifacts(directory)
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware – profiles requests that carry a valid token."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        token = _requested_token(scope) if scope["type"] == "http" else None
+        if token is None:
+            await self.app(scope, receive, send)
+            return
+
+        fmt = verify_token(token, scope["path"])
+        if fmt is None:
+            await _refusal(403, "Invalid or expired profiling token")(
+                scope, receive, send
+            )
+        elif scope["path"].startswith(ARTIFACT_PREFIX):
+            await self._download(scope, receive, send)
+        else:
+            await self._profile(scope, receive, send, fmt)
+
+    async def _download(self, scope: Scope, receive: Receive, send: Send) -> None:
+        name = scope["path"].removeprefix(ARTIFACT_PREFIX)
+        path = output_dir() / name
+        if not _ARTIFACT_NAME.match(name) or not path.is_file():
+            await _refusal(404, "Profile not found")(scope, receive, send)
+            return
+        await FileResponse(path, filename=name)(scope, receive, send)
+
+    async def _profile(
+        self, scope: Scope, receive: Receive, send: Send, fmt: str
+    ) -> None:
+        global _active
+        if _active:
+            await _refusal(409, "Another request is being profiled")(
+                scope, receive, send
+            )
+            return
+
+        name = _artifact_name(scope, fmt)
+
+        async def send_with_artifact(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-Artifact", name)
+            await send(message)
+
+        _active = True
+        profiler = sampler = None
+        try:
+            if fmt == "pstats":
+                profiler = cProfile.Profile()
+                profiler.enable()
+            else:
+                sampler = _StackSampler(
+                    asyncio.current_task(), settings.PROFILING_SAMPLE_INTERVAL_SECONDS
+                )
+                sampler.start()
+            try:
+                await self.app(scope, receive, send_with_artifact)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                if sampler is not None:
+                    sampler.stop()
+        finally:
+            _active = False
+
+        await asyncio.to_thread(_write_artifact, name, profiler, sampler)
+        logger.info(
+            "Profiled %s %s -> %s", scope["method"], scope["path"], output_dir() / name
+        )
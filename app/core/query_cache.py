@@ -0,0 +1,228 @@
+"""Read-through caching for service read methods.
+
+`@cached_query(name, ttl=...)` wraps an async service method (whose instance
+has a `db` session): the result is stored under `name` plus a key derived
+from the call's arguments, for `ttl` seconds. With `CACHE_BACKEND=memory`
+each cached method gets its own LRU bounded by `max_entries`; with `redis`
+all methods share the cross-worker backend.
+
+Writers never touch the cache directly. They call `invalidate_on_commit()`
+with the cached method and the arguments that changed (or none, for "every
+entry of this method"); the request session applies the collected
+invalidations right after a successful commit and drops them on rollback.
+Reads made by a session that has already written bypass the cache, so
+uncommitted data is never cached. A read that was already running when an
+entry was invalidated – it may have seen the pre-write rows – doesn't store
+its result; with read replicas, neither does one that started less than
+`QUERY_CACHE_REPLICA_LAG_SECONDS` after the invalidation.
+
+Every cache is registered by name, so invalidations can be broadcast to
+other workers and replayed there via `invalidate()` (see
+`app.core.pg_listener`). `QueryCache` can also be used directly for lookups
+that are not service methods.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core.cache import CacheBackend, MemoryCache, get_cache
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_F = TypeVar("_F", bound=Callable[..., Awaitable[Any]])
+
+# name -> QueryCache, for invalidations addressed by name.
+_REGISTRY: dict[str, QueryCache] = {}
+# session.info key holding {cache name: set of keys, or None for "all"}.
+_PENDING = "query_cache_invalidations"
+
+
+class QueryCache:
+    """One cached method (or lookup): its key namespace, TTL and storage."""
+
+    def __init__(self, name: str, *, ttl: float, max_entries: int) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local: MemoryCache | None = None
+        # When this worker last invalidated each key / every key (monotonic).
+        # Evicted keys raise `_floor`, so they still count as invalidated then.
+        self._invalidated_at: OrderedDict[str, float] = OrderedDict()
+        self._invalidated_all_at = float("-inf")
+        self._floor = float("-inf")
+        _REGISTRY[name] = self
+
+    def key_for(self, *args: Any, **kwargs: Any) -> str:
+        """Cache key for a lookup argument; `cached_query` derives it from
+        the method signature instead."""
+        (arg,) = args
+        return str(arg)
+
+    @property
+    def enabled(self) -> bool:
+        return settings.QUERY_CACHE_ENABLED and self.ttl > 0
+
+    @property
+    def backend(self) -> CacheBackend:
+        if settings.CACHE_BACKEND == "memory":
+            if self._local is None:
+                self._local = MemoryCache(self.max_entries)
+            return self._local
+        return get_cache()
+
+    def _full_key(self, key: str) -> str:
+        return f"query:{self.name}:{key}"
+
+    async def get(self, key: str) -> Any | None:
+        return await self.backend.get(self._full_key(key))
+
+    async def set(self, key: str, value: Any) -> None:
+        await self.backend.set(self._full_key(key), value, self.ttl)
+
+    async def discard(self, key: str) -> None:
+        await self.backend.delete(self._full_key(key))
+
+    def invalidated_since(self, key: str, since: float) -> bool:
+        """Whether `key` was invalidated after monotonic time `since`."""
+        last = max(
+            self._invalidated_all_at,
+            self._floor,
+            self._invalidated_at.get(key, float("-inf")),
+        )
+        return last > since
+
+    def _record_invalidation(self, keys: set[str] | None) -> None:
+        now = time.monotonic()
+        if keys is None:
+            self._invalidated_all_at = now
+            self._invalidated_at.clear()
+            return
+        for key in keys:
+            self._invalidated_at[key] = now
+            self._invalidated_at.move_to_end(key)
+        while len(self._invalidated_at) > self.max_entries:
+            _, invalidated_at = self._invalidated_at.popitem(last=False)
+            self._floor = max(self._floor, invalidated_at)
+
+    async def invalidate(self, keys: set[str] | None = None) -> None:
+        """Drop the given keys, or every entry when `keys` is None."""
+        self._record_invalidation(keys)
+        if keys is None:
+            await self.backend.delete_prefix(self._full_key(""))
+        elif keys:
+            await self.backend.delete(*(self._full_key(key) for key in keys))
+
+
+def _replica_lag_allowance() -> float:
+    return (
+        settings.QUERY_CACHE_REPLICA_LAG_SECONDS if settings.DATABASE_READ_URL else 0.0
+    )
+
+
+def cached_query(
+    name: str,
+    *,
+    ttl: float,
+    dump: Callable[[Any], Any],
+    load: Callable[[Any], Any],
+    max_entries: int | None = None,
+) -> Callable[[_F], _F]:
+    """Cache an async service method; `dump`/`load` convert its result to and
+    from a JSON-serializable value."""
+
+    def decorator(fn: _F) -> _F:
+        cache = QueryCache(
+            name, ttl=ttl, max_entries=max_entries or settings.QUERY_CACHE_MAX_ENTRIES
+        )
+        signature = inspect.signature(fn)
+
+        def cache_key(*args: Any, **kwargs: Any) -> str:
+            bound = signature.bind(None, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(list(bound.arguments.items())[1:])  # drop `self`
+            return json.dumps(arguments, sort_keys=True, default=str)
+
+        cache.key_for = cache_key  # type: ignore[method-assign]
+
+        @functools.wraps(fn)
+        async def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            if not cache.enabled or self.db.info.get("wrote"):
+                return await fn(self, *args, **kwargs)
+            key = cache.key_for(*args, **kwargs)
+            hit = await cache.get(key)
+            if hit is not None:
+                return load(hit["value"])
+            since = time.monotonic() - _replica_lag_allowance()
+            result = await fn(self, *args, **kwargs)
+            # Invalidated while the query ran: the result may predate the
+            # write, so don't let it outlive the invalidation.
+            if cache.invalidated_since(key, since):
+                return result
+            # Wrapped so that a cached `None` is distinguishable from a miss.
+            await cache.set(key, {"value": dump(result)})
+            # A shared backend may have applied an invalidation issued during
+            # the set before the set itself.
+            if cache.invalidated_since(key, since):
+                await cache.discard(key)
+            return result
+
+        wrapper.cache = cache  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def invalidate_on_commit(
+    session: AsyncSession, target: Any, *args: Any, **kwargs: Any
+) -> None:
+    """Schedule invalidation of the entry for these arguments – or of all
+    entries when called without arguments – for after the commit.
+
+    `target` is a `@cached_query` method or a `QueryCache`.
+    """
+    cache: QueryCache = getattr(target, "cache", target)
+    pending: dict[str, set[str] | None] = session.info.setdefault(_PENDING, {})
+    if not args and not kwargs:
+        pending[cache.name] = None
+    elif pending.get(cache.name, set()) is not None:
+        pending.setdefault(cache.name, set()).add(cache.key_for(*args, **kwargs))
+
+
+def pending_invalidations(session: AsyncSession) -> dict[str, set[str] | None]:
+    return session.info.get(_PENDING) or {}
+
+
+def discard_invalidations(session: AsyncSession) -> None:
+    session.info.pop(_PENDING, None)
+
+
+async def invalidate(name: str, keys: set[str] | None = None) -> None:
+    cache = _REGISTRY.get(name)
+    if cache is None:
+        logger.debug("Ignoring invalidation for unknown query cache %r", name)
+        return
+    await cache.invalidate(keys)
+
+
+async def invalidate_all() -> None:
+    """Drop every registered cache, e.g. after missing broadcast messages."""
+    for cache in _REGISTRY.values():
+        await cache.invalidate()
+
+
+async def apply_invalidations(session: AsyncSession) -> None:
+    """Run the invalidations collected on `session` (call after commit)."""
+    for name, keys in session.info.pop(_PENDING, {}).items():
+        await invalidate(name, keys)
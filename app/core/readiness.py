@@ -0,0 +1,216 @@
+"""Startup warm-up, background DB probe and readiness state.
+
+After a deploy or worker restart the first requests would otherwise pay for
+TCP+TLS connects to Postgres, the JWKS fetch and SQLAlchemy compiling the hot
+statements. `warm_up()` does that work up front (in the background, so the
+worker still answers liveness probes) and flips the warm-up flag when done.
+
+Health endpoints never touch the request pool: `probe_database_forever()`
+checks Postgres on a fixed interval over its own single connection and the
+endpoints just report the last result. Until the first probe has completed,
+`/health` runs one on demand (`ensure_database_probed()`), so a fresh worker
+doesn't report a healthy database as unreachable.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.config import get_settings
+from app.core.exceptions import AppException
+from app.core.supabase_security import get_jwks
+from app.utils.db import get_asyncpg_connect_args
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_STATE: dict[str, Any] = {
+    "warmed_up": False,
+    "warmed_up_at": None,
+    "warmup_seconds": None,
+}
+_DB_PROBE: dict[str, Any] = {
+    "ok": None,  # None until the first probe completes
+    "checked_at": None,
+    "latency_ms": None,
+    "error": None,
+}
+# Postgres being unreachable or failing a query. TimeoutError (an OSError)
+# covers connects and the probe timeout.
+_DB_ERRORS = (SQLAlchemyError, OSError)
+_probe_engine: AsyncEngine | None = None
+_probe_lock = asyncio.Lock()
+
+
+def is_ready() -> bool:
+    return bool(_STATE["warmed_up"]) and _DB_PROBE["ok"] is True
+
+
+def readiness_snapshot() -> dict[str, Any]:
+    return {**_STATE, "ready": is_ready(), "database": dict(_DB_PROBE)}
+
+
+def database_status() -> dict[str, Any]:
+    return dict(_DB_PROBE)
+
+
+def mark_ready() -> None:
+    _STATE["warmed_up"] = True
+    _STATE["warmed_up_at"] = time.time()
+
+
+def pool_status() -> dict[str, Any]:
+    """Snapshot of the request pool – how close we are to queueing."""
+    from app.database import engine
+
+    pool = engine.pool
+    capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    checked_out = pool.checkedout()
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": checked_out,
+        "overflow": max(0, pool.overflow()),
+        "capacity": capacity,
+        "saturation": round(checked_out / capacity, 3) if capacity else None,
+    }
+
+
+async def _fill_pool() -> None:
+    """Open DB_POOL_SIZE connections per engine concurrently so none are
+    created lazily (primary and every read replica)."""
+    from app.database import engine, read_engines
+
+    async def checkout(eng: AsyncEngine) -> None:
+        async with eng.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # All checkouts are requested before any is returned, so each pool has to
+    # open a distinct connection for each of them.
+    await asyncio.gather(
+        *(
+            checkout(eng)
+            for eng in (engine, *read_engines)
+            for _ in range(settings.DB_POOL_SIZE)
+        )
+    )
+
+
+async def _prime_statements() -> None:
+    """Run the hot queries once to fill SQLAlchemy's compiled-statement cache."""
+    from app.database import async_session_factory
+    from app.services.auth import AuthService
+    from app.services.item import ItemService
+
+    async with async_session_factory() as session:
+        items = ItemService(session)
+        # The list query `list_items` runs (see ITEM_READ_PATH).
+        if settings.ITEM_READ_PATH == "orm":
+            await items.get_all(skip=0, limit=1)
+        else:
+            await items.get_rows(skip=0, limit=1)
+        await items.get_by_id(0)
+        await AuthService(session).get_user_by_supabase_user_id("")
+        await session.rollback()
+
+
+async def _prefetch_jwks() -> None:
+    if not settings.SUPABASE_JWKS_URL:
+        return
+    try:
+        await get_jwks()
+    except AppException as exc:
+        # Not fatal: the first authenticated request will retry the fetch.
+        logger.warning("JWKS prefetch failed: %s", exc.detail)
+
+
+async def warm_up(*, retry_delay: float = 1.0, max_retry_delay: float = 30.0) -> None:
+    """Warm the pool, JWKS and statement cache, then mark the worker ready.
+
+    DB failures are retried with exponential backoff – the worker stays
+    "not ready" until Postgres is reachable.
+    """
+    started = time.perf_counter()
+    jwks_task = asyncio.create_task(_prefetch_jwks())
+    delay = retry_delay
+    while True:
+        try:
+            await _fill_pool()
+            await _prime_statements()
+            break
+        except _DB_ERRORS as exc:
+            logger.warning("DB warm-up failed (%s); retrying in %.0fs", exc, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_retry_delay)
+        except Exception:
+            # A bug, not an outage: retrying won't help, and the worker
+            # stays not ready – make sure it's in the logs.
+            logger.exception("DB warm-up failed")
+            raise
+    await jwks_task
+
+    _STATE["warmup_seconds"] = round(time.perf_counter() - started, 3)
+    mark_ready()
+    logger.info("Warm-up finished in %.2fs", _STATE["warmup_seconds"])
+
+
+def _get_probe_engine() -> AsyncEngine:
+    """A one-connection engine so probes never queue behind request traffic."""
+    global _probe_engine
+    if _probe_engine is None:
+        _probe_engine = create_async_engine(
+            settings.DATABASE_URL,
+            connect_args=get_asyncpg_connect_args(settings.DATABASE_URL),
+            pool_size=1,
+            max_overflow=0,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    return _probe_engine
+
+
+async def probe_database() -> None:
+    started = time.perf_counter()
+    try:
+        async with asyncio.timeout(settings.HEALTH_PROBE_TIMEOUT_SECONDS):
+            async with _get_probe_engine().connect() as conn:
+                await conn.execute(text("SELECT 1"))
+    except _DB_ERRORS as exc:
+        if _DB_PROBE["ok"] is not False:
+            logger.warning("Database probe failed: %s", exc or type(exc).__name__)
+        _DB_PROBE.update(ok=False, error=type(exc).__name__, latency_ms=None)
+    else:
+        _DB_PROBE.update(
+            ok=True,
+            error=None,
+            latency_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
+    _DB_PROBE["checked_at"] = time.time()
+
+
+async def ensure_database_probed() -> None:
+    """Probe now if no probe has completed yet; concurrent callers share it."""
+    if _DB_PROBE["ok"] is not None:
+        return
+    async with _probe_lock:
+        if _DB_PROBE["ok"] is None:
+            await probe_database()
+
+
+async def probe_database_forever() -> None:
+    while True:
+        await probe_database()
+        await asyncio.sleep(settings.HEALTH_PROBE_INTERVAL_SECONDS)
+
+
+async def dispose_probe_engine() -> None:
+    global _probe_engine
+    if _probe_engine is not None:
+        await _probe_engine.dispose()
+        _probe_engine = None
@@ -1,7 +1,9 @@
 """Supabase JWT verification utilities.
 
 Verifies Supabase-issued access tokens (JWT) using the Supabase JWKS (public keys).
-Keys are cached in-memory with TTL to avoid fetching JWKS on every request.
+Keys are cached in-memory with TTL to avoid fetching JWKS on every request,
+and in the shared cache tier (`app.core.cache`) so that with several gunicorn
+workers only one of them fetches per TTL.
 """
 
 from __future__ import annotations
@@ -14,6 +16,7 @@ import httpx
 from jose import JWTError, jwk, jwt
 
 from app.config import get_settings
+from app.core.cache import get_cache
 from app.core.exceptions import UnauthorizedException
 
 settings = get_settings()
@@ -23,6 +26,7 @@ _JWKS_CACHE: dict[str, Any] = {
     "jwks": None,
     "expires_at": 0.0,
 }
+_JWKS_SHARED_KEY = "supabase:jwks"
 
 
 async def _fetch_jwks() -> dict[str, Any]:
@@ -65,9 +69,19 @@ async def get_jwks(*, force_refresh: bool = False) -> dict[str, Any]:
         if not force_refresh and cached is not None and now < expires_at:
             return cached
 
-        jwks = await _fetch_jwks()
+        # Another worker may already have fetched it.
+        shared = None if force_refresh else await get_cache().get(_JWKS_SHARED_KEY)
+        if shared is not None and now < float(shared["expires_at"]):
+            jwks, expires_at = shared["jwks"], float(shared["expires_at"])
+        else:
+            ttl = max(30, int(settings.SUPABASE_JWKS_CACHE_TTL_SECONDS))
+            jwks = await _fetch_jwks()
+            expires_at = now + ttl
+            await get_cache().set(
+                _JWKS_SHARED_KEY, {"jwks": jwks, "expires_at": expires_at}, ttl
+            )
         _JWKS_CACHE["jwks"] = jwks
-        _JWKS_CACHE["expires_at"] = now + max(30, int(settings.SUPABASE_JWKS_CACHE_TTL_SECONDS))
+        _JWKS_CACHE["expires_at"] = expires_at
         return jwks
 
 
@@ -0,0 +1,190 @@
+"""Per-request phase timing exposed as a `Server-Timing` response header.
+
+Durations are accumulated in a request-scoped contextvar, so any layer
+(dependencies, services, SQLAlchemy event hooks) can record a phase without
+threading state through call signatures. When the middleware is not
+installed the contextvar stays `None` and `phase()` is a no-op.
+
+Recorded phases:
+- `auth`      – Supabase JWT verification
+- `pool`      – waiting for a pooled DB connection (checkout + pre-ping)
+- `db`        – query execution on the driver
+- `serialize` – building response schemas, plus (on `TimedRoute` routes)
+  FastAPI's `jsonable_encoder` pass and rendering the JSON body
+- `total`     – time until the response headers are sent
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_TIMINGS: ContextVar[dict[str, float] | None] = ContextVar(
+    "server_timing", default=None
+)
+# When the endpoint of the current request returned. A mutable cell so sync
+# endpoints, which run in a copied context, can fill it in too.
+_ENDPOINT_RETURNED: ContextVar[list[float] | None] = ContextVar(
+    "endpoint_returned", default=None
+)
+
+
+def record(name: str, seconds: float) -> None:
+    """Add `seconds` to phase `name` for the current request (if timed)."""
+    timings = _TIMINGS.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time the enclosed block as phase `name`. Works around `await`s too."""
+    timings = _TIMINGS.get()
+    if timings is None:
+        yield
+        return
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + (perf_counter() - start)
+
+
+def format_server_timing(timings: dict[str, float]) -> str:
+    return ", ".join(
+        f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items()
+    )
+
+
+def _stamp_return(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    def stamp() -> None:
+        returned = _ENDPOINT_RETURNED.get()
+        if returned is not None:
+            returned.append(perf_counter())
+
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_endpoint(*args: Any, **kwargs: Any) -> Any:
+            result = await endpoint(*args, **kwargs)
+            stamp()
+            return result
+
+        return async_endpoint
+
+    @functools.wraps(endpoint)
+    def sync_endpoint(*args: Any, **kwargs: Any) -> Any:
+        result = endpoint(*args, **kwargs)
+        stamp()
+        return result
+
+    return sync_endpoint
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that adds what FastAPI does after the endpoint returns –
+    `jsonable_encoder`, response-model validation, rendering the body – to
+    the `serialize` phase."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, _stamp_return(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            if _TIMINGS.get() is None:
+                return await handler(request)
+            returned: list[float] = []
+            token = _ENDPOINT_RETURNED.set(returned)
+            try:
+                response = await handler(request)
+            finally:
+                _ENDPOINT_RETURNED.reset(token)
+            if returned:
+                record("serialize", perf_counter() - returned[-1])
+            return response
+
+        return timed_handler
+
+
+class ServerTimingMiddleware:
+    """Pure ASGI middleware – adds `Server-Timing` to every HTTP response."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: dict[str, float] = {}
+        token = _TIMINGS.set(timings)
+        start = perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                timings["total"] = perf_counter() - start
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", format_server_timing(timings))
+                # Lets browser devtools show the breakdown for cross-origin calls.
+                headers.append("Timing-Allow-Origin", "*")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _TIMINGS.reset(token)
+
+
+def instrument_engines(*engines: AsyncEngine) -> None:
+    """Record `pool` and `db` phases via SQLAlchemy event hooks.
+
+    Only call this when Server-Timing is enabled; the hooks are never
+    registered otherwise, so the disabled path has zero overhead.
+    """
+
+    def _before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        conn.info.setdefault("_timing_query_start", []).append(perf_counter())
+
+    def _after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        starts = conn.info.get("_timing_query_start")
+        if starts:
+            record("db", perf_counter() - starts.pop())
+
+    for engine in engines:
+        event.listen(
+            engine.sync_engine, "before_cursor_execute", _before_cursor_execute
+        )
+        event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+    # The session creates its root transaction lazily and only then checks a
+    # connection out of the pool; `after_begin` fires once it has one.
+    @event.listens_for(Session, "after_transaction_create")
+    def _after_transaction_create(session, transaction):
+        if transaction.parent is None:
+            session.info["_timing_checkout_start"] = perf_counter()
+
+    @event.listens_for(Session, "after_begin")
+    def _after_begin(session, transaction, connection):
+        start = session.info.pop("_timing_checkout_start", None)
+        if start is not None:
+            record("pool", perf_counter() - start)
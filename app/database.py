@@ -1,45 +1,225 @@
-"""Async SQLAlchemy engine & session factory."""
+"""Async SQLAlchemy engines & session factory.
 
-from collections.abc import AsyncGenerator
+The primary `engine` handles all writes. When `DATABASE_READ_URL` lists
+replicas, each gets its own engine/pool and `RoutingSession` sends SELECTs
+to one of them – but only for sessions obtained via `get_read_db`, and only
+until the session writes, so a request always reads its own writes.
 
+Sessions check a connection out lazily, on their first query. Read-only
+sessions run their SELECTs in AUTOCOMMIT, so a GET costs no BEGIN / COMMIT /
+reset ROLLBACK round-trips, and the request session is closed as soon as the
+endpoint returns – before the response is serialized and sent.
+
+Transactions started during a request with a deadline (`app.core.deadlines`)
+begin with `SET LOCAL statement_timeout` set to the time left.
+"""
+
+import itertools
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session
 
 from app.config import get_settings
-from app.utils.db import get_asyncpg_connect_args
+from app.core.deadlines import statement_timeout_ms
+from app.core.pg_listener import publish_invalidations
+from app.core.query_cache import (
+    apply_invalidations,
+    discard_invalidations,
+    pending_invalidations,
+)
+from app.utils.db import (
+    autocommit_reads_supported,
+    get_asyncpg_connect_args,
+    install_pooler_fallback,
+)
 
 settings = get_settings()
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    connect_args=get_asyncpg_connect_args(settings.DATABASE_URL),
-    pool_size=settings.DB_POOL_SIZE,
-    max_overflow=settings.DB_MAX_OVERFLOW,
-    pool_timeout=settings.DB_POOL_TIMEOUT,
-    pool_recycle=settings.DB_POOL_RECYCLE,
-    pool_pre_ping=True,
-    echo=settings.DEBUG,
+
+def _create_engine(url: str) -> AsyncEngine:
+    eng = create_async_engine(
+        url,
+        connect_args=get_asyncpg_connect_args(url),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        echo=settings.DEBUG,
+    )
+    install_pooler_fallback(eng, url)
+    return eng
+
+
+engine = _create_engine(settings.DATABASE_URL)
+read_engines: list[AsyncEngine] = [
+    _create_engine(url) for url in settings.DATABASE_READ_URL
+]
+
+# Targets for read-only SELECTs: each replica (or the primary) together with
+# an AUTOCOMMIT view sharing its pool.
+_reader_cycle = itertools.cycle(
+    [
+        (url, eng, eng.execution_options(isolation_level="AUTOCOMMIT"))
+        for url, eng in (
+            zip(settings.DATABASE_READ_URL, read_engines)
+            if read_engines
+            else [(settings.DATABASE_URL, engine)]
+        )
+    ]
 )
 
+
+class RoutingSession(Session):
+    """Session that serves read-only SELECTs outside a transaction.
+
+    Read routing requires `info["replica_ok"]` (set by `get_read_db`) and is
+    disabled by `info["pin_primary"]` (set by `get_db`) or once the session
+    has written anything. Reads then go, in AUTOCOMMIT where the endpoint
+    allows it, to one replica chosen per session – or to the primary when no
+    replicas are configured.
+
+    Once a session has used the primary's transactional bind it stays there.
+    Code that moves a session from reads to the primary calls
+    `release_reader()` first: the AUTOCOMMIT view shares its engine's pool,
+    so holding both would take two connections from one pool per request –
+    and a burst of such requests can deadlock the pool.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw) -> Engine:
+        if getattr(clause, "is_dml", False):
+            self.info["wrote"] = True
+        elif (
+            self.info.get("replica_ok")
+            and not self.info.get("pin_primary")
+            and not self.info.get("wrote")
+            and not self.info.get("on_primary")
+            and not self._flushing
+            and getattr(clause, "is_select", False)
+        ):
+            reader = self.info.get("reader")
+            if reader is None:
+                reader = self.info["reader"] = next(_reader_cycle)
+            url, transactional, autocommit = reader
+            # Transaction poolers need the statement inside a transaction
+            # unless they track prepared statements themselves.
+            if autocommit_reads_supported(url):
+                return autocommit.sync_engine
+            return transactional.sync_engine
+        self.info["on_primary"] = True
+        return engine.sync_engine
+
+
+async def release_reader(session: AsyncSession) -> None:
+    """Return the session's reader connection before it moves to the primary.
+
+    Until the session has written, everything it ran was a read-only SELECT
+    (AUTOCOMMIT where supported), so committing only ends that work and
+    checks the reader connection back in. Loaded objects stay usable
+    (`expire_on_commit=False`).
+    """
+    info = session.info
+    if (
+        info.get("reader") is not None
+        and not info.get("wrote")
+        and not info.get("on_primary")
+    ):
+        await session.commit()
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_written(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_begin")
+def _push_statement_timeout(session: Session, transaction, connection) -> None:
+    # Bound every query by the request deadline. SET LOCAL only lasts until
+    # the transaction ends, so nothing leaks into the pooled connection.
+    timeout_ms = statement_timeout_ms()
+    if timeout_ms is None:
+        return
+    if connection.get_execution_options().get("isolation_level") == "AUTOCOMMIT":
+        return
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+
+
 async_session_factory = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False,
 )
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+@asynccontextmanager
+async def transaction_scope() -> AsyncIterator[AsyncSession]:
     """
-    FastAPI dependency that yields an async DB session.
-    Commits on success, rolls back on exception.
+    A session that commits on exit and rolls back on exception. Query-cache
+    invalidations collected by the services are broadcast inside the
+    transaction and applied locally only once the commit succeeded.
     """
     async with async_session_factory() as session:
         try:
             yield session
+            if pending_invalidations(session):
+                await publish_invalidations(session)
             await session.commit()
         except Exception:
+            discard_invalidations(session)
             await session.rollback()
             raise
+        await apply_invalidations(session)
+
+
+async def _request_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    One async DB session per request, shared by `get_db` / `get_read_db`,
+    managed by `transaction_scope`. Committing a session that only ran
+    AUTOCOMMIT reads does not touch the database.
+    """
+    async with transaction_scope() as session:
+        yield session
+
+
+# scope="function": the session is committed / closed and its connection
+# returned to the pool right after the endpoint returns, not after the
+# response has been sent.
+async def get_db(
+    session: AsyncSession = Depends(_request_session, scope="function"),
+) -> AsyncSession:
+    """
+    FastAPI dependency returning the request's DB session, pinned to the
+    primary. Use for anything that writes or must read its own writes.
+    """
+    # Auth may have read through this session already (`get_read_db`).
+    await release_reader(session)
+    session.info["pin_primary"] = True
+    return session
+
+
+async def get_read_db(
+    session: AsyncSession = Depends(_request_session, scope="function"),
+) -> AsyncSession:
+    """
+    FastAPI dependency for read paths: SELECTs run in AUTOCOMMIT (on a read
+    replica, if configured) unless the same request also depends on `get_db`
+    or has already written.
+    """
+    session.info["replica_ok"] = True
+    return session
+
+
+async def dispose_engines() -> None:
+    for eng in (engine, *read_engines):
+        await eng.dispose()
@@ -3,14 +3,19 @@ Application entry-point.
 Creates the FastAPI app with lifespan, middleware, and routers.
 """
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 
 from app.config import get_settings
+from app.core.admission import AdmissionControlMiddleware
+from app.core.compression import CompressionMiddleware
 from app.core.exceptions import register_exception_handlers
+from app.core.logs import AccessLogMiddleware, configure_logging, stop_logging
+from app.core.timing import ServerTimingMiddleware, instrument_engines
 
 settings = get_settings()
 
@@ -18,13 +23,51 @@ settings = get_settings()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup / shutdown logic (connection pools, caches, etc.)."""
+    from app.core.cache import get_cache
+    from app.core.loop_monitor import monitor_loop_forever
+    from app.core.pg_listener import listen_forever
+    from app.core.readiness import (
+        dispose_probe_engine,
+        mark_ready,
+        probe_database_forever,
+        warm_up,
+    )
+
     # ── Startup ───────────────────────────────────────────
-    # e.g. warm up DB pool, load ML models, start schedulers
+    # Build the cache backend now, so a misconfigured one (e.g.
+    # CACHE_BACKEND=redis without the `redis` package) stops the worker
+    # instead of failing the first request that touches it.
+    get_cache()
+    # In the lifespan, not at import: it starts a thread, which must happen
+    # in each (forked) worker.
+    configure_logging()
+    # Warm-up runs in the background so liveness probes are answered
+    # immediately; readiness flips once the pool and caches are primed.
+    background: list[asyncio.Task] = [
+        asyncio.create_task(probe_database_forever()),
+        asyncio.create_task(listen_forever()),
+        asyncio.create_task(monitor_loop_forever()),
+    ]
+    if settings.WARMUP_ON_STARTUP:
+        background.append(asyncio.create_task(warm_up()))
+    else:
+        mark_ready()
     yield
     # ── Shutdown ──────────────────────────────────────────
-    from app.database import engine
+    from app.core.cache import close_cache
+    from app.core.idempotency import close_idempotency_store
+    from app.database import dispose_engines
 
-    await engine.dispose()
+    for task in background:
+        task.cancel()
+    for task in background:
+        with suppress(asyncio.CancelledError):
+            await task
+    await dispose_probe_engine()
+    await close_idempotency_store()
+    await dispose_engines()
+    await close_cache()
+    stop_logging()
 
 
 app = FastAPI(
@@ -37,6 +80,11 @@ app = FastAPI(
 )
 
 # ── Middleware (order matters – outermost first) ──────────
+# Admission control is added first so it sits innermost: rejected requests
+# still get CORS and Server-Timing headers.
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -48,6 +96,26 @@ app.add_middleware(
 if settings.is_prod:
     app.add_middleware(TrustedHostMiddleware, allowed_hosts=["*"])
 
+# Inside Server-Timing, so `total` includes the compression work.
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+if settings.SERVER_TIMING_ENABLED:
+    from app.database import engine, read_engines
+
+    instrument_engines(engine, *read_engines)
+    app.add_middleware(ServerTimingMiddleware)
+
+# Profiled requests include every middleware but the access log.
+if settings.PROFILING_SECRET and not settings.is_prod:
+    from app.core.profiling import ProfilingMiddleware
+
+    app.add_middleware(ProfilingMiddleware)
+
+# Outermost: the request id covers everything, and the logged status and
+# duration are what the client got.
+app.add_middleware(AccessLogMiddleware)
+
 # ── Exception handlers ───────────────────────────────────
 register_exception_handlers(app)
 
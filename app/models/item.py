@@ -1,4 +1,6 @@
-from sqlalchemy import Float, String, Text
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Index, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base, TimestampMixin
@@ -6,9 +8,29 @@ from app.models.base import Base, TimestampMixin
 
 class Item(TimestampMixin, Base):
     __tablename__ = "items"
+    # Keyset order for delta sync (`/items/changes`).
+    __table_args__ = (Index("ix_items_updated_at_id", "updated_at", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(255), index=True)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
     price: Mapped[float] = mapped_column(Float, nullable=False)
     tax: Mapped[float | None] = mapped_column(Float, nullable=True, default=0.0)
+    # Client-supplied key (e.g. a catalog SKU) for idempotent bulk upserts.
+    external_id: Mapped[str | None] = mapped_column(
+        String(255), unique=True, index=True, nullable=True
+    )
+
+
+class ItemTombstone(Base):
+    """Records a deleted item so delta sync can tell clients to drop it."""
+
+    __tablename__ = "item_tombstones"
+    __table_args__ = (Index("ix_item_tombstones_deleted_at_id", "deleted_at", "id"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
@@ -1,6 +1,7 @@
 from datetime import datetime
+from typing import Any
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 
 # ── Request schemas ───────────────────────────────────────
@@ -9,6 +10,7 @@ class ItemCreate(BaseModel):
     description: str | None = None
     price: float
     tax: float | None = 0.0
+    external_id: str | None = Field(None, max_length=255)
 
 
 class ItemUpdate(BaseModel):
@@ -17,6 +19,22 @@ class ItemUpdate(BaseModel):
     description: str | None = None
     price: float | None = None
     tax: float | None = None
+    external_id: str | None = Field(None, max_length=255)
+
+
+class ItemBulkUpdate(ItemUpdate):
+    """One entry of PATCH /items/bulk: the id plus the fields to change."""
+    id: int
+
+    @model_validator(mode="after")
+    def _has_changes(self) -> "ItemBulkUpdate":
+        if not self.model_fields_set - {"id"}:
+            raise ValueError("no fields to update")
+        return self
+
+
+class ItemBulkDelete(BaseModel):
+    ids: list[int] = Field(..., min_length=1)
 
 
 # ── Response schemas ──────────────────────────────────────
@@ -28,5 +46,46 @@ class ItemRead(BaseModel):
     description: str | None = None
     price: float
     tax: float | None = None
+    external_id: str | None = None
     created_at: datetime
     updated_at: datetime
+
+
+# Names accepted by the `fields=` query parameter.
+ITEM_FIELDS = tuple(ItemRead.model_fields)
+
+
+def dump_item_fields(item: Any, fields: tuple[str, ...]) -> dict[str, Any]:
+    """Sparse fieldset: serialize only `fields` of an ORM item, formatted
+    exactly as `ItemRead` would (without touching unloaded columns)."""
+    values = {field: getattr(item, field) for field in fields}
+    return ItemRead.model_construct(**values).model_dump(mode="json", include=set(fields))
+
+
+class ItemChanges(BaseModel):
+    """Delta-sync page: upsert `items`, drop `deleted`, then resume from
+    `next_token` (immediately while `has_more`)."""
+
+    items: list[ItemRead]
+    deleted: list[int]
+    next_token: str
+    has_more: bool
+
+
+class ItemBulkUpdateResult(BaseModel):
+    items: list[ItemRead]
+    not_found: list[int]
+
+
+class ItemBulkDeleteResult(BaseModel):
+    deleted: list[int]
+    not_found: list[int]
+
+
+class ItemUpsertResult(BaseModel):
+    """Bulk import in upsert mode: rows written, and the external ids of
+    rows that already matched (not written, not returned)."""
+
+    created: list[ItemRead]
+    updated: list[ItemRead]
+    unchanged: list[str]
@@ -4,8 +4,20 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
+from app.core.query_cache import QueryCache, invalidate_on_commit
+from app.database import release_reader
 from app.models.user import User
 
+settings = get_settings()
+
+# Supabase user id -> cached local user row (see `app.api.deps`).
+identity_cache = QueryCache(
+    "users.identity",
+    ttl=settings.IDENTITY_CACHE_TTL_SECONDS,
+    max_entries=settings.CACHE_MAX_ENTRIES,
+)
+
 
 class AuthService:
     def __init__(self, db: AsyncSession):
@@ -44,11 +56,14 @@ class AuthService:
             return user
 
         by_email = await self.get_user_by_email(email)
+        # Provisioning writes: the lookups above may have used a reader.
+        await release_reader(self.db)
         if by_email is not None:
             if by_email.supabase_user_id and by_email.supabase_user_id != supabase_user_id:
                 return None
             by_email.supabase_user_id = supabase_user_id
             self.db.add(by_email)
+            invalidate_on_commit(self.db, identity_cache, supabase_user_id)
             try:
                 await self.db.flush()
                 await self.db.refresh(by_email)
@@ -69,6 +84,7 @@ class AuthService:
             is_superuser=False,
         )
         self.db.add(user)
+        invalidate_on_commit(self.db, identity_cache, supabase_user_id)
         try:
             await self.db.flush()
             await self.db.refresh(user)
@@ -89,6 +105,7 @@ class AuthService:
             if not existing_by_email.supabase_user_id:
                 existing_by_email.supabase_user_id = supabase_user_id
                 self.db.add(existing_by_email)
+                invalidate_on_commit(self.db, identity_cache, supabase_user_id)
                 try:
                     await self.db.flush()
                     await self.db.refresh(existing_by_email)
@@ -1,37 +1,290 @@
 """Item business logic – keeps endpoints thin."""
 
-from sqlalchemy import select, func
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import (
+    Integer,
+    any_,
+    bindparam,
+    column,
+    delete,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+from app.config import get_settings
+from app.core.batching import MicroBatcher
+from app.core.fanout import Fanout
+from app.core.pg_listener import add_handler, add_reconnect_handler, notify
+from app.core.query_cache import cached_query, invalidate_on_commit
+from app.database import transaction_scope
+from app.models.item import Item, ItemTombstone
+from app.schemas.item import ItemBulkUpdate, ItemCreate, ItemUpdate
+from app.utils.sync import SyncCursor
+
+settings = get_settings()
+
+# Ids per NOTIFY payload (payloads are capped at 8000 bytes).
+_EVENT_IDS_PER_MESSAGE = 500
+
+# Item change events from every worker, fed by this worker's LISTEN connection.
+item_events = Fanout(
+    "items",
+    queue_size=settings.STREAM_CLIENT_QUEUE_SIZE,
+    max_subscribers=settings.STREAM_MAX_CLIENTS,
+)
+add_handler(settings.ITEM_EVENTS_CHANNEL, item_events.publish_async)
+
+
+async def _resync_subscribers() -> None:
+    # Events may have been missed while the LISTEN connection was down.
+    item_events.publish({"op": "resync", "ids": []})
+
+
+add_reconnect_handler(_resync_subscribers)
+
+_ITEM_COLUMNS = tuple(col.key for col in Item.__table__.columns)
+_ITEM_TIMESTAMPS = ("created_at", "updated_at")
+
+
+def _dump_row(row: Mapping[str, Any]) -> dict[str, Any]:
+    row = dict(row)
+    for col_name in _ITEM_TIMESTAMPS:
+        if col_name in row:
+            row[col_name] = row[col_name].isoformat()
+    return row
+
+
+def _load_row(row: dict[str, Any]) -> dict[str, Any]:
+    for col_name in _ITEM_TIMESTAMPS:
+        if col_name in row:
+            row = {**row, col_name: datetime.fromisoformat(row[col_name])}
+    return row
+
+
+def _dump_item(item: Item | None) -> dict[str, Any] | None:
+    if item is None:
+        return None
+    # Only loaded columns: sparse reads leave the others unloaded.
+    return _dump_row(
+        {
+            col_name: item.__dict__[col_name]
+            for col_name in _ITEM_COLUMNS
+            if col_name in item.__dict__
+        }
+    )
 
-from app.models.item import Item
-from app.schemas.item import ItemCreate, ItemUpdate
+
+def _load_item(row: dict[str, Any] | None) -> Item | None:
+    """Rebuild a (transient) Item from a cached row – read-only use."""
+    if row is None:
+        return None
+    return Item(**_load_row(row))
+
+
+def _dump_page(page: tuple[list[Item], int]) -> dict[str, Any]:
+    items, total = page
+    return {"items": [_dump_item(item) for item in items], "total": total}
+
+
+def _load_page(data: dict[str, Any]) -> tuple[list[Item], int]:
+    return [_load_item(row) for row in data["items"]], data["total"]
+
+
+def _dump_rows_page(page: tuple[list[dict[str, Any]], int]) -> dict[str, Any]:
+    rows, total = page
+    return {"rows": [_dump_row(row) for row in rows], "total": total}
+
+
+def _load_rows_page(data: dict[str, Any]) -> tuple[list[dict[str, Any]], int]:
+    return [_load_row(row) for row in data["rows"]], data["total"]
+
+
+def _chunks(rows: list[Any]) -> list[list[Any]]:
+    size = settings.ITEM_BULK_CHUNK_SIZE
+    return [rows[start : start + size] for start in range(0, len(rows), size)]
 
 
 class ItemService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    @cached_query(
+        "items.get_all",
+        ttl=settings.ITEM_LIST_CACHE_TTL_SECONDS,
+        dump=_dump_page,
+        load=_load_page,
+    )
     async def get_all(
-        self, *, skip: int = 0, limit: int = 100
+        self,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        fields: tuple[str, ...] | None = None,
     ) -> tuple[list[Item], int]:
-        """Return (items, total_count) for pagination."""
+        """Return (items, total_count) for pagination.
+
+        With `fields`, only those columns (plus `id`) are SELECTed; the other
+        attributes stay unloaded and must not be accessed.
+        """
+        total = await self.db.scalar(select(func.count(Item.id)))
+        query = select(Item).offset(skip).limit(limit).order_by(Item.id)
+        if fields is not None:
+            query = query.options(load_only(*(getattr(Item, field) for field in fields)))
+        result = await self.db.execute(query)
+        return list(result.scalars().all()), total or 0
+
+    @cached_query(
+        "items.get_rows",
+        ttl=settings.ITEM_LIST_CACHE_TTL_SECONDS,
+        dump=_dump_rows_page,
+        load=_load_rows_page,
+    )
+    async def get_rows(
+        self,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        fields: tuple[str, ...] | None = None,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """`get_all` without the ORM: plain column dicts, ready to serialize.
+
+        A Core select() – no Item instances, identity map or attribute
+        instrumentation – for read-only listing. Rows have the same keys
+        (`fields`, or every column) and values `ItemRead` would produce.
+        """
         total = await self.db.scalar(select(func.count(Item.id)))
+        columns = Item.__table__.c
         result = await self.db.execute(
-            select(Item).offset(skip).limit(limit).order_by(Item.id)
+            select(*(columns[name] for name in fields or _ITEM_COLUMNS))
+            .offset(skip)
+            .limit(limit)
+            .order_by(columns.id)
         )
-        return list(result.scalars().all()), total or 0
+        return [dict(row) for row in result.mappings()], total or 0
 
+    @cached_query(
+        "items.get_by_id",
+        ttl=settings.ITEM_CACHE_TTL_SECONDS,
+        dump=_dump_item,
+        load=_load_item,
+    )
     async def get_by_id(self, item_id: int) -> Item | None:
+        return await self._load(item_id)
+
+    async def _load(self, item_id: int) -> Item | None:
+        """Uncached lookup returning a session-attached Item, for writers."""
         result = await self.db.execute(
             select(Item).where(Item.id == item_id)
         )
         return result.scalar_one_or_none()
 
+    async def get_changes(
+        self, since: SyncCursor | None, *, limit: int
+    ) -> tuple[list[Item], list[int], SyncCursor, bool]:
+        """Changed items and deleted ids after `since`, in (updated_at, id)
+        order: returns (items, deleted_ids, next_cursor, has_more).
+
+        Only changes older than the safety window are returned – rows written
+        by a still-open transaction carry its start time and would otherwise
+        become visible behind the cursor.
+        """
+        horizon = await self.db.scalar(
+            select(func.now() - timedelta(seconds=settings.SYNC_SAFETY_WINDOW_SECONDS))
+        )
+        items_query = (
+            select(Item)
+            .where(Item.updated_at < horizon)
+            .order_by(Item.updated_at, Item.id)
+            .limit(limit + 1)
+        )
+        tombstones_query = (
+            select(ItemTombstone.deleted_at, ItemTombstone.id)
+            .where(ItemTombstone.deleted_at < horizon)
+            .order_by(ItemTombstone.deleted_at, ItemTombstone.id)
+            .limit(limit + 1)
+        )
+        if since is not None:
+            items_query = items_query.where(
+                tuple_(Item.updated_at, Item.id) > tuple_(*since)
+            )
+            tombstones_query = tombstones_query.where(
+                tuple_(ItemTombstone.deleted_at, ItemTombstone.id) > tuple_(*since)
+            )
+
+        items = (await self.db.execute(items_query)).scalars().all()
+        tombstones = (await self.db.execute(tombstones_query)).all()
+        changes: list[tuple[SyncCursor, Item | None]] = sorted(
+            [(SyncCursor(item.updated_at, item.id), item) for item in items]
+            + [(SyncCursor(row.deleted_at, row.id), None) for row in tombstones],
+            key=lambda change: change[0],
+        )
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        if has_more:
+            next_cursor = changes[-1][0]
+        else:
+            # Caught up: everything before the horizon has been returned.
+            next_cursor = max(SyncCursor(horizon, 0), since or SyncCursor(horizon, 0))
+        return (
+            [item for _, item in changes if item is not None],
+            [cursor.id for cursor, item in changes if item is None],
+            next_cursor,
+            has_more,
+        )
+
+    async def prune_tombstones(self, older_than: timedelta) -> int:
+        """Delete tombstones older than `older_than`; returns how many."""
+        result = await self.db.execute(
+            delete(ItemTombstone).where(ItemTombstone.deleted_at < func.now() - older_than)
+        )
+        return result.rowcount
+
+    async def _emit(self, op: str, item_ids: list[int]) -> None:
+        """Publish a change event; delivered to streams only on commit."""
+        if not settings.PG_NOTIFY_ENABLED:
+            return
+        for start in range(0, len(item_ids), _EVENT_IDS_PER_MESSAGE):
+            await notify(
+                self.db,
+                settings.ITEM_EVENTS_CHANNEL,
+                {"op": op, "ids": item_ids[start : start + _EVENT_IDS_PER_MESSAGE]},
+            )
+
+    def _invalidate(self, *item_ids: int) -> None:
+        for item_id in item_ids:
+            invalidate_on_commit(self.db, ItemService.get_by_id, item_id)
+        # Any write can move rows between pages and changes the total.
+        invalidate_on_commit(self.db, ItemService.get_all)
+        invalidate_on_commit(self.db, ItemService.get_rows)
+
     async def create(self, data: ItemCreate) -> Item:
+        if create_batcher is not None and not self.db.info.get("wrote"):
+            # The batch commits on its own connection; this session has only
+            # read, so end its transaction rather than hold a pooled
+            # connection while waiting.
+            await self.db.commit()
+            return await create_batcher.submit(data.model_dump())
         item = Item(**data.model_dump())
         self.db.add(item)
         await self.db.flush()
         await self.db.refresh(item)
+        self._invalidate(item.id)
+        await self._emit("created", [item.id])
         return item
 
     async def create_bulk(self, items_data: list[ItemCreate]) -> list[Item]:
@@ -41,21 +294,178 @@ class ItemService:
         await self.db.flush()
         for item in items:
             await self.db.refresh(item)
+        self._invalidate(*(item.id for item in items))
+        await self._emit("created", [item.id for item in items])
         return items
 
+    async def upsert_bulk(
+        self, items_data: list[ItemCreate]
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[str]]:
+        """Insert or update items by `external_id`, one
+        `INSERT ... ON CONFLICT (external_id) DO UPDATE ... RETURNING` per
+        chunk. Rows whose values already match are left alone – no write, no
+        new row version. Returns (created rows, updated rows, unchanged
+        external ids), in request order."""
+        table = Item.__table__
+        rows = [item.model_dump() for item in items_data]
+        fields = [field for field in rows[0] if field != "external_id"]
+        written: dict[str, dict[str, Any]] = {}
+        for chunk in _chunks(rows):
+            statement = pg_insert(table).values(chunk)
+            excluded = statement.excluded
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.external_id],
+                # ON CONFLICT ignores Column.onupdate: bump updated_at here.
+                set_={**{field: excluded[field] for field in fields}, "updated_at": func.now()},
+                where=or_(*(table.c[field].is_distinct_from(excluded[field]) for field in fields)),
+            ).returning(
+                *table.c,
+                # xmax is 0 only for a freshly inserted row version.
+                literal_column("items.xmax = 0").label("inserted"),
+            )
+            result = await self.db.execute(statement)
+            written.update((row["external_id"], dict(row)) for row in result.mappings())
+
+        created: list[dict[str, Any]] = []
+        updated: list[dict[str, Any]] = []
+        unchanged: list[str] = []
+        for row in rows:
+            item = written.get(row["external_id"])
+            if item is None:
+                unchanged.append(row["external_id"])
+            else:
+                (created if item.pop("inserted") else updated).append(item)
+        if written:
+            self._invalidate(*(item["id"] for item in written.values()))
+            if created:
+                await self._emit("created", [item["id"] for item in created])
+            if updated:
+                await self._emit("updated", [item["id"] for item in updated])
+        return created, updated, unchanged
+
     async def update(self, item_id: int, data: ItemUpdate) -> Item | None:
-        item = await self.get_by_id(item_id)
+        item = await self._load(item_id)
         if not item:
             return None
         for key, value in data.model_dump(exclude_unset=True).items():
             setattr(item, key, value)
         await self.db.flush()
         await self.db.refresh(item)
+        self._invalidate(item_id)
+        await self._emit("updated", [item_id])
         return item
 
+    async def update_bulk(
+        self, changes: list[ItemBulkUpdate]
+    ) -> tuple[list[dict[str, Any]], list[int]]:
+        """Apply many partial updates set-based: one
+        `UPDATE items ... FROM (VALUES ...) RETURNING` per chunk of entries
+        that change the same fields. Returns (updated rows in request order,
+        ids that do not exist)."""
+        table = Item.__table__
+        groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        for change in changes:
+            data = change.model_dump(exclude_unset=True)
+            groups.setdefault(tuple(sorted(data.keys() - {"id"})), []).append(data)
+
+        updated: dict[int, dict[str, Any]] = {}
+        for fields, rows in groups.items():
+            for chunk in _chunks(rows):
+                changed = values(
+                    column("id", Integer),
+                    *(column(field, table.c[field].type) for field in fields),
+                    name="changes",
+                ).data([(row["id"], *(row[field] for field in fields)) for row in chunk])
+                result = await self.db.execute(
+                    update(table)
+                    .where(table.c.id == changed.c.id)
+                    .values({field: changed.c[field] for field in fields})
+                    .returning(*table.c)
+                )
+                updated.update((row["id"], dict(row)) for row in result.mappings())
+
+        if updated:
+            self._invalidate(*updated)
+            await self._emit("updated", list(updated))
+        return (
+            [updated[change.id] for change in changes if change.id in updated],
+            [change.id for change in changes if change.id not in updated],
+        )
+
+    async def delete_bulk(self, item_ids: list[int]) -> tuple[list[int], list[int]]:
+        """Delete many items with `DELETE ... WHERE id = ANY(...)` per chunk,
+        leaving tombstones. Returns (deleted ids, ids that do not exist)."""
+        table = Item.__table__
+        ids = list(dict.fromkeys(item_ids))
+        deleted: set[int] = set()
+        for chunk in _chunks(ids):
+            result = await self.db.execute(
+                delete(table)
+                .where(table.c.id == any_(bindparam("ids", chunk, type_=ARRAY(Integer))))
+                .returning(table.c.id)
+            )
+            deleted.update(result.scalars())
+
+        if deleted:
+            await self.db.execute(
+                insert(ItemTombstone.__table__), [{"id": item_id} for item_id in deleted]
+            )
+            self._invalidate(*deleted)
+            await self._emit("deleted", sorted(deleted))
+        return (
+            [item_id for item_id in ids if item_id in deleted],
+            [item_id for item_id in ids if item_id not in deleted],
+        )
+
     async def delete(self, item_id: int) -> bool:
-        item = await self.get_by_id(item_id)
+        item = await self._load(item_id)
         if not item:
             return False
         await self.db.delete(item)
+        self.db.add(ItemTombstone(id=item_id))
+        self._invalidate(item_id)
+        await self._emit("deleted", [item_id])
         return True
+
+
+# ── Create batching ──────────────────────────────────────
+async def _insert_items(rows: list[dict[str, Any]]) -> list[Item]:
+    """One multi-row INSERT ... RETURNING + commit; returns transient Items."""
+    table = Item.__table__
+    async with transaction_scope() as session:
+        result = await session.execute(
+            insert(table).returning(*table.c, sort_by_parameter_order=True), rows
+        )
+        items = [Item(**row) for row in result.mappings()]
+        svc = ItemService(session)
+        svc._invalidate(*(item.id for item in items))
+        await svc._emit("created", [item.id for item in items])
+    return items
+
+
+async def _insert_item_batch(rows: list[dict[str, Any]]) -> list[Item | BaseException]:
+    try:
+        return await _insert_items(rows)
+    except DBAPIError:
+        if len(rows) == 1:
+            raise
+    # One bad row must not fail its neighbours: retry them one by one.
+    results: list[Item | BaseException] = []
+    for row in rows:
+        try:
+            results.extend(await _insert_items([row]))
+        except DBAPIError as exc:
+            results.append(exc)
+    return results
+
+
+create_batcher: MicroBatcher[dict[str, Any], Item] | None = (
+    MicroBatcher(
+        "items.create",
+        _insert_item_batch,
+        max_size=settings.ITEM_CREATE_BATCH_MAX_SIZE,
+        max_delay=settings.ITEM_CREATE_BATCH_WINDOW_SECONDS,
+    )
+    if settings.ITEM_CREATE_BATCHING_ENABLED
+    else None
+)
@@ -0,0 +1,40 @@
+"""Mint a token that makes one endpoint profile itself (non-prod only).
+
+Uses `PROFILING_SECRET` from the environment / `.env` of the target
+deployment:
+
+    python -m app.tools.profile_token /api/v1/items
+    python -m app.tools.profile_token /api/v1/items --format collapsed --ttl 600
+
+Send it as `X-Profile: <token>` (or `?_profile=<token>`); the response names
+the artifact in `X-Profile-Artifact`. Download it with a token for
+`/_profiles/<name>`:
+
+    python -m app.tools.profile_token /_profiles/<name>
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from app.config import get_settings
+from app.core.profiling import FORMATS, make_token
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Mint a request-profiling token.")
+    parser.add_argument("path", help="exact request path, e.g. /api/v1/items/42")
+    parser.add_argument("--format", choices=list(FORMATS), default="pstats")
+    parser.add_argument(
+        "--ttl", type=float, default=3600, help="seconds the token stays valid"
+    )
+    args = parser.parse_args()
+    if not settings.PROFILING_SECRET:
+        sys.exit("PROFILING_SECRET is not set")
+    print(make_token(args.path, args.format, args.ttl))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Delete item tombstones past the delta-sync retention window.
+
+Clients whose sync token predates the retention get 410 from
+`/api/v1/items/changes` and resync from scratch, so older tombstones are
+never needed. Run it daily (cron / scheduled job):
+
+    python -m app.tools.prune_tombstones
+    python -m app.tools.prune_tombstones --days 14
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import timedelta
+
+from app.config import get_settings
+from app.database import async_session_factory, dispose_engines
+from app.services.item import ItemService
+
+
+async def _prune(days: int) -> int:
+    try:
+        async with async_session_factory() as session:
+            pruned = await ItemService(session).prune_tombstones(timedelta(days=days))
+            await session.commit()
+            return pruned
+    finally:
+        await dispose_engines()
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Prune old item tombstones.")
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+        help="keep tombstones younger than this (default: SYNC_TOMBSTONE_RETENTION_DAYS)",
+    )
+    args = parser.parse_args()
+    print(f"pruned {asyncio.run(_prune(args.days))} tombstones")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""Synthetic dataset generator for load / pagination testing.
+
+Streams deterministic fake `items` (and optionally `users`) into Postgres
+with asyncpg `COPY`, which is orders of magnitude faster than going through
+the API or the ORM.
+
+Usage:
+    python -m app.tools.seed --items 5000000
+    python -m app.tools.seed --items 2000000 --users 50000 --jobs 4 --truncate
+    python -m app.tools.seed --items 1000000 --price-distribution lognormal \\
+        --null-description-ratio 0.3 --description-length 600
+
+The same `--seed` and `--batch-size` always produce the same rows, regardless
+of `--jobs`: every batch derives its own RNG from (seed, table, batch index).
+Row generation is CPU-bound (~100k rows/s per process), so use `--jobs` to
+reach several hundred thousand rows/s.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import random
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+import asyncpg
+
+from app.config import get_settings
+from app.utils.db import get_raw_asyncpg_connect_args
+
+ITEM_COLUMNS = ("name", "description", "price", "tax", "created_at", "updated_at")
+USER_COLUMNS = (
+    "email",
+    "hashed_password",
+    "supabase_user_id",
+    "is_active",
+    "is_superuser",
+    "created_at",
+    "updated_at",
+)
+
+# fmt: off
+_ADJECTIVES = (
+    "red", "blue", "green", "small", "large", "vintage", "modern", "organic",
+    "wireless", "portable", "premium", "classic", "smart", "compact", "heavy",
+    "light", "steel", "wooden", "glass", "leather",
+)
+_NOUNS = (
+    "chair", "lamp", "keyboard", "bottle", "backpack", "table", "speaker",
+    "jacket", "kettle", "monitor", "notebook", "watch", "camera", "bicycle",
+    "headphones", "mug", "shelf", "charger", "blanket", "drone",
+)
+_LOREM = (
+    "lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing",
+    "elit", "sed", "do", "eiusmod", "tempor", "incididunt", "ut", "labore",
+    "et", "dolore", "magna", "aliqua", "ut", "enim", "ad", "minim", "veniam",
+    "quis", "nostrud", "exercitation", "ullamco", "laboris", "nisi", "ut",
+    "aliquip", "ex", "ea", "commodo",
+)
+# fmt: on
+
+
+@dataclass(frozen=True)
+class SeedOptions:
+    dsn: str
+    seed: int
+    batch_size: int
+    price_distribution: str
+    min_price: float
+    max_price: float
+    null_description_ratio: float
+    description_length: int
+    days: int
+    now: datetime
+
+
+def _price_sampler(opts: SeedOptions, rng: random.Random) -> Callable[[], float]:
+    lo, hi = opts.min_price, opts.max_price
+    if opts.price_distribution == "uniform":
+        return lambda: round(rng.uniform(lo, hi), 2)
+    if opts.price_distribution == "lognormal":
+        # Median around the geometric mean of the range, long right tail.
+        mu = math.log(math.sqrt(lo * hi))
+        return lambda: round(min(hi, max(lo, rng.lognormvariate(mu, 0.9))), 2)
+    if opts.price_distribution == "pareto":
+        return lambda: round(min(hi, lo * rng.paretovariate(1.5)), 2)
+    raise ValueError(f"Unknown price distribution: {opts.price_distribution}")
+
+
+def _description_pool(
+    opts: SeedOptions, rng: random.Random, size: int = 512
+) -> list[str]:
+    """Pre-build descriptions once per batch; sampling beats generating per row."""
+    pool = []
+    for _ in range(size):
+        target = max(1, int(rng.expovariate(1 / max(1, opts.description_length))))
+        words: list[str] = []
+        length = 0
+        while length < target:
+            word = rng.choice(_LOREM)
+            words.append(word)
+            length += len(word) + 1
+        pool.append(" ".join(words)[:target])
+    return pool
+
+
+def _item_rows(opts: SeedOptions, batch_index: int, count: int) -> list[tuple]:
+    rng = random.Random(f"{opts.seed}:items:{batch_index}")
+    price = _price_sampler(opts, rng)
+    descriptions = _description_pool(opts, rng)
+    span = opts.days * 86400
+    rows = []
+    for _ in range(count):
+        created = opts.now - timedelta(seconds=rng.random() * span)
+        updated = created + timedelta(
+            seconds=rng.random() * (opts.now - created).total_seconds()
+        )
+        rows.append(
+            (
+                f"{rng.choice(_ADJECTIVES)} {rng.choice(_NOUNS)} {rng.randrange(100000)}",
+                None
+                if rng.random() < opts.null_description_ratio
+                else rng.choice(descriptions),
+                price(),
+                rng.choice((0.0, 0.05, 0.1, 0.15, 0.2)),
+                created,
+                updated,
+            )
+        )
+    return rows
+
+
+def _user_rows(opts: SeedOptions, batch_index: int, count: int) -> list[tuple]:
+    rng = random.Random(f"{opts.seed}:users:{batch_index}")
+    first = batch_index * opts.batch_size
+    span = opts.days * 86400
+    rows = []
+    for n in range(first, first + count):
+        created = opts.now - timedelta(seconds=rng.random() * span)
+        rows.append(
+            (
+                f"seed-user-{opts.seed}-{n}@example.com",
+                None,
+                str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+                rng.random() > 0.02,
+                False,
+                created,
+                created,
+            )
+        )
+    return rows
+
+
+async def _copy_batches(
+    opts: SeedOptions, table: str, batches: list[tuple[int, int]]
+) -> int:
+    generate = _item_rows if table == "items" else _user_rows
+    columns = ITEM_COLUMNS if table == "items" else USER_COLUMNS
+    conn = await asyncpg.connect(opts.dsn, **get_raw_asyncpg_connect_args(opts.dsn))
+    loaded = 0
+    try:
+        for batch_index, count in batches:
+            rows = generate(opts, batch_index, count)
+            await conn.copy_records_to_table(table, records=rows, columns=columns)
+            loaded += len(rows)
+    finally:
+        await conn.close()
+    return loaded
+
+
+def _run_worker(opts: SeedOptions, table: str, batches: list[tuple[int, int]]) -> int:
+    return asyncio.run(_copy_batches(opts, table, batches))
+
+
+def _plan(total: int, batch_size: int) -> list[tuple[int, int]]:
+    return [
+        (index, min(batch_size, total - start))
+        for index, start in enumerate(range(0, total, batch_size))
+    ]
+
+
+def _load(opts: SeedOptions, table: str, total: int, jobs: int) -> None:
+    if total <= 0:
+        return
+    plan = _plan(total, opts.batch_size)
+    # Round-robin batches across worker processes; generation is CPU-bound.
+    shards = [plan[i::jobs] for i in range(jobs) if plan[i::jobs]]
+    started = time.perf_counter()
+    if len(shards) == 1:
+        loaded = _run_worker(opts, table, shards[0])
+    else:
+        with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+            loaded = sum(
+                pool.map(
+                    _run_worker, [opts] * len(shards), [table] * len(shards), shards
+                )
+            )
+    elapsed = time.perf_counter() - started
+    print(
+        f"{table}: {loaded:,} rows in {elapsed:.1f}s ({loaded / elapsed:,.0f} rows/s)"
+    )
+
+
+async def _prepare(dsn: str, *, truncate: bool, tables: list[str]) -> None:
+    conn = await asyncpg.connect(dsn, **get_raw_asyncpg_connect_args(dsn))
+    try:
+        if truncate and tables:
+            await conn.execute(f"TRUNCATE {', '.join(tables)} RESTART IDENTITY")
+    finally:
+        await conn.close()
+
+
+async def _analyze(dsn: str, tables: list[str]) -> None:
+    conn = await asyncpg.connect(dsn, **get_raw_asyncpg_connect_args(dsn))
+    try:
+        for table in tables:
+            await conn.execute(f"ANALYZE {table}")
+    finally:
+        await conn.close()
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        description="Bulk-load synthetic items/users with COPY."
+    )
+    parser.add_argument(
+        "--items", type=int, default=1_000_000, help="number of items to create"
+    )
+    parser.add_argument(
+        "--users", type=int, default=0, help="number of users to create"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=42, help="RNG seed (same seed → same rows)"
+    )
+    parser.add_argument("--batch-size", type=int, default=50_000, help="rows per COPY")
+    parser.add_argument("--jobs", type=int, default=1, help="parallel loader processes")
+    parser.add_argument(
+        "--price-distribution",
+        choices=("uniform", "lognormal", "pareto"),
+        default="lognormal",
+    )
+    parser.add_argument("--min-price", type=float, default=1.0)
+    parser.add_argument("--max-price", type=float, default=5000.0)
+    parser.add_argument("--null-description-ratio", type=float, default=0.1)
+    parser.add_argument(
+        "--description-length",
+        type=int,
+        default=200,
+        help="mean description length (chars)",
+    )
+    parser.add_argument(
+        "--days", type=int, default=365, help="spread timestamps over N days"
+    )
+    parser.add_argument(
+        "--truncate", action="store_true", help="empty target tables first"
+    )
+    parser.add_argument(
+        "--database-url",
+        default=settings.ALEMBIC_DATABASE_URL or settings.DATABASE_URL,
+        help="defaults to ALEMBIC_DATABASE_URL / DATABASE_URL (prefer a direct, non-pooler host)",
+    )
+    args = parser.parse_args()
+
+    dsn = args.database_url.replace("postgresql+asyncpg://", "postgresql://", 1)
+    opts = SeedOptions(
+        dsn=dsn,
+        seed=args.seed,
+        batch_size=args.batch_size,
+        price_distribution=args.price_distribution,
+        min_price=args.min_price,
+        max_price=args.max_price,
+        null_description_ratio=args.null_description_ratio,
+        description_length=args.description_length,
+        days=args.days,
+        # Fixed anchor so timestamps are reproducible across runs.
+        now=datetime(2026, 1, 1, tzinfo=UTC),
+    )
+    tables = [t for t, n in (("items", args.items), ("users", args.users)) if n > 0]
+
+    asyncio.run(_prepare(dsn, truncate=args.truncate, tables=tables))
+    _load(opts, "users", args.users, max(1, args.jobs))
+    _load(opts, "items", args.items, max(1, args.jobs))
+    asyncio.run(_analyze(dsn, tables))
+
+
+if __name__ == "__main__":
+    main()
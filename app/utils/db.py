@@ -6,29 +6,90 @@ Supabase frequently sits behind PgBouncer (especially when using the
 `pooler.supabase.com:6543` endpoint). In that mode, asyncpg's statement
 cache / prepared statements can cause errors. We also need SSL for
 Supabase-hosted Postgres.
+
+Prepared statements behind a transaction pooler
+-----------------------------------------------
+By default every statement is prepared under a unique name and never cached,
+which works with any pooler but makes Postgres re-parse and re-plan each
+query. Poolers with protocol-level prepared statement support (PgBouncer
+>= 1.21 with `max_prepared_statements` > 0) can keep SQLAlchemy's per-
+connection statement cache: set `DB_POOLER_PREPARED_STATEMENTS=true`. If the
+pooler turns out not to support it, `install_pooler_fallback` flips the
+process back to the uncached mode on the first prepared-statement error.
 """
 
 from __future__ import annotations
 
+import logging
 import os
 import ssl
 from urllib.parse import parse_qs
 from urllib.parse import urlparse
+from uuid import uuid4
 
 import certifi
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# SQLSTATEs raised when a pooler hands a statement to a server connection
+# that doesn't know it (26000) or already has one with that name (42P05).
+_PREPARED_STATEMENT_SQLSTATES = {"26000", "42P05"}
+_POOLER_STATE = {"prepared_statements_failed": False}
+
+
+def _env_flag(name: str) -> bool:
+    return (os.getenv(name) or "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def is_transaction_pooler(database_url: str) -> bool:
+    """True for Supabase's pooler endpoint, or when DB_TRANSACTION_POOLER=true
+    (e.g. a self-hosted PgBouncer in transaction mode on another port)."""
+    parsed = urlparse(database_url)
+    host = (parsed.hostname or "").lower()
+    return (
+        parsed.port == 6543
+        or host.endswith(".pooler.supabase.com")
+        or _env_flag("DB_TRANSACTION_POOLER")
+    )
+
+
+def pooler_prepared_statements_enabled(database_url: str) -> bool:
+    return (
+        is_transaction_pooler(database_url)
+        and _env_flag("DB_POOLER_PREPARED_STATEMENTS")
+        and not _POOLER_STATE["prepared_statements_failed"]
+    )
+
+
+def autocommit_reads_supported(database_url: str) -> bool:
+    """Whether SELECTs may run outside a transaction on this URL.
+
+    Without a transaction a transaction pooler may send the Parse and the
+    Execute of one statement to different server connections, which only
+    works when the pooler tracks prepared statements itself.
+    """
+    return not is_transaction_pooler(
+        database_url
+    ) or pooler_prepared_statements_enabled(database_url)
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid4().hex}__"
 
 
 def get_asyncpg_connect_args(database_url: str) -> dict:
     """Return `connect_args` suitable for SQLAlchemy+asyncpg.
 
     - Enables SSL automatically for Supabase hosts.
-    - Disables asyncpg statement caching when using Supabase pooler (PgBouncer)
-      to avoid prepared-statement errors.
+    - Behind a transaction pooler (PgBouncer / Supabase pooler), uses unique
+      prepared statement names and disables statement caching unless
+      DB_POOLER_PREPARED_STATEMENTS is enabled (see module docstring).
     """
 
     parsed = urlparse(database_url)
     host = (parsed.hostname or "").lower()
-    port = parsed.port
     query = parse_qs(parsed.query)
 
     connect_args: dict = {}
@@ -85,7 +146,52 @@ def get_asyncpg_connect_args(database_url: str) -> dict:
 
     # Supabase's pooler endpoint uses PgBouncer; prepared statements can break.
     # Port 6543 is the common Supabase pooler port.
-    if port == 6543 or host.endswith(".pooler.supabase.com"):
+    if is_transaction_pooler(database_url):
         connect_args["statement_cache_size"] = 0
+        # asyncpg's sequential names (`__asyncpg_stmt_1__`) collide when two
+        # clients share a server connection; unique names never do.
+        connect_args["prepared_statement_name_func"] = _unique_statement_name
+        if not pooler_prepared_statements_enabled(database_url):
+            connect_args["prepared_statement_cache_size"] = 0
 
     return connect_args
+
+
+def get_raw_asyncpg_connect_args(database_url: str) -> dict:
+    """`get_asyncpg_connect_args` minus SQLAlchemy-only keys, for plain
+    `asyncpg.connect()` callers (seed tool, LISTEN connections)."""
+    return {
+        key: value
+        for key, value in get_asyncpg_connect_args(database_url).items()
+        if not key.startswith("prepared_statement_")
+    }
+
+
+def install_pooler_fallback(engine: AsyncEngine, database_url: str) -> None:
+    """Fall back to uncached statements if the pooler rejects cached ones.
+
+    On the first "prepared statement does not exist / already exists" error
+    the failing connection is treated as a disconnect (so the pool is
+    recycled) and every new connection is opened without a statement cache.
+    """
+    if not pooler_prepared_statements_enabled(database_url):
+        return
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _on_error(context) -> None:
+        sqlstate = getattr(context.original_exception, "sqlstate", None)
+        if sqlstate not in _PREPARED_STATEMENT_SQLSTATES:
+            return
+        if not _POOLER_STATE["prepared_statements_failed"]:
+            logger.warning(
+                "Pooler rejected a cached prepared statement (SQLSTATE %s); "
+                "disabling DB_POOLER_PREPARED_STATEMENTS for this process",
+                sqlstate,
+            )
+        _POOLER_STATE["prepared_statements_failed"] = True
+        context.is_disconnect = True
+
+    @event.listens_for(engine.sync_engine, "do_connect")
+    def _on_connect(dialect, conn_rec, cargs, cparams) -> None:
+        if _POOLER_STATE["prepared_statements_failed"]:
+            cparams["prepared_statement_cache_size"] = 0
@@ -0,0 +1,42 @@
+"""Opaque resume tokens for delta-sync endpoints.
+
+A token is the keyset position `(updated_at, id)` of the last change a client
+has applied, base64url-encoded so clients treat it as opaque and never build
+one themselves.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import NamedTuple
+
+_TOKEN_VERSION = 1
+
+
+class SyncCursor(NamedTuple):
+    updated_at: datetime
+    id: int
+
+
+def encode_sync_token(cursor: SyncCursor) -> str:
+    raw = json.dumps(
+        {"v": _TOKEN_VERSION, "t": cursor.updated_at.isoformat(), "i": cursor.id},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> SyncCursor:
+    """Parse a token from `encode_sync_token`; raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        if data["v"] != _TOKEN_VERSION:
+            raise ValueError("unsupported sync token version")
+        updated_at = datetime.fromisoformat(data["t"])
+        if updated_at.tzinfo is None:
+            raise ValueError("sync token timestamp has no timezone")
+        return SyncCursor(updated_at, int(data["i"]))
+    except (binascii.Error, UnicodeDecodeError, KeyError, TypeError) as exc:
+        raise ValueError("malformed sync token") from exc
@@ -0,0 +1,241 @@
+"""HTTP load benchmark for the items + auth endpoints.
+
+Usage:
+    python -m benchmarks.api_load --docker                     # disposable Postgres
+    python -m benchmarks.api_load --database-url postgresql+asyncpg://...
+    python -m benchmarks.api_load --docker --concurrency 1 16 64 --duration 15 \\
+        --output bench_output.json
+
+Each scenario runs for `--duration` seconds at every concurrency level with a
+fixed pool of workers (closed-loop), after a short warm-up. Results are
+printed as JSON so runs can be diffed before/after a change.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+from benchmarks.harness import (
+    LatencyRecorder,
+    SigningKey,
+    app_env,
+    disposable_postgres,
+    migrate,
+    run_app,
+    start_stub_server,
+    wait_for_postgres,
+)
+
+SCENARIOS = ("list_items", "get_item", "create_item", "bulk_import", "auth_me")
+
+
+@dataclass
+class Context:
+    client: httpx.AsyncClient
+    auth_headers: dict[str, str]
+    item_ids: list[int]
+    rng: random.Random
+    bulk_size: int
+    per_page: int
+
+
+def _item_payload(rng: random.Random) -> dict[str, Any]:
+    return {
+        "name": f"bench-{rng.randrange(1_000_000)}",
+        "description": "x" * rng.randrange(0, 400),
+        "price": round(rng.uniform(1, 500), 2),
+        "tax": round(rng.uniform(0, 0.25), 2),
+    }
+
+
+RequestFn = Callable[[Context], Awaitable[httpx.Response]]
+
+
+def _list_items(ctx: Context) -> Awaitable[httpx.Response]:
+    page = ctx.rng.randint(1, max(1, len(ctx.item_ids) // ctx.per_page))
+    return ctx.client.get(
+        "/api/v1/items", params={"page_no": page, "per_page": ctx.per_page}
+    )
+
+
+def _get_item(ctx: Context) -> Awaitable[httpx.Response]:
+    return ctx.client.get(f"/api/v1/items/{ctx.rng.choice(ctx.item_ids)}")
+
+
+def _create_item(ctx: Context) -> Awaitable[httpx.Response]:
+    return ctx.client.post(
+        "/api/v1/items", json=_item_payload(ctx.rng), headers=ctx.auth_headers
+    )
+
+
+def _bulk_import(ctx: Context) -> Awaitable[httpx.Response]:
+    return ctx.client.post(
+        "/api/v1/items/bulk/import",
+        json=[_item_payload(ctx.rng) for _ in range(ctx.bulk_size)],
+        headers=ctx.auth_headers,
+    )
+
+
+def _auth_me(ctx: Context) -> Awaitable[httpx.Response]:
+    return ctx.client.get("/api/v1/auth/me", headers=ctx.auth_headers)
+
+
+REQUESTS: dict[str, RequestFn] = {
+    "list_items": _list_items,
+    "get_item": _get_item,
+    "create_item": _create_item,
+    "bulk_import": _bulk_import,
+    "auth_me": _auth_me,
+}
+
+
+async def _run_level(
+    ctx: Context, fn: RequestFn, concurrency: int, duration: float, warmup: float
+) -> dict[str, Any]:
+    recorder = LatencyRecorder()
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    async def worker() -> None:
+        while True:
+            t0 = time.perf_counter()
+            if t0 >= stop_at:
+                return
+            try:
+                resp = await fn(ctx)
+                status: int | None = resp.status_code
+            except httpx.HTTPError:
+                status = None
+            t1 = time.perf_counter()
+            if t0 >= measure_from:
+                recorder.add(t1 - t0, status)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - measure_from
+    return {"concurrency": concurrency, **recorder.summary(elapsed)}
+
+
+async def _seed(ctx: Context, count: int) -> None:
+    """Create `count` items through the bulk endpoint so reads have data."""
+    remaining = count
+    while remaining > 0:
+        batch = min(500, remaining)
+        resp = await ctx.client.post(
+            "/api/v1/items/bulk/import",
+            json=[_item_payload(ctx.rng) for _ in range(batch)],
+            headers=ctx.auth_headers,
+        )
+        resp.raise_for_status()
+        ctx.item_ids.extend(item["id"] for item in resp.json()["data"])
+        remaining -= batch
+
+
+async def _benchmark(args: argparse.Namespace, database_url: str) -> dict[str, Any]:
+    await wait_for_postgres(database_url)
+    key = SigningKey(alg=args.alg)
+    async with start_stub_server(key) as stub:
+        env = app_env(database_url, stub, DB_POOL_SIZE=str(args.pool_size))
+        migrate(env)
+        async with run_app(env, workers=args.workers) as base_url:
+            limits = httpx.Limits(
+                max_connections=max(args.concurrency),
+                max_keepalive_connections=max(args.concurrency),
+            )
+            async with httpx.AsyncClient(
+                base_url=base_url, limits=limits, timeout=args.request_timeout
+            ) as client:
+                token = key.mint(
+                    issuer=stub.issuer,
+                    sub=str(uuid.uuid4()),
+                    email=f"bench-{uuid.uuid4().hex[:8]}@example.com",
+                )
+                ctx = Context(
+                    client=client,
+                    auth_headers={"Authorization": f"Bearer {token}"},
+                    item_ids=[],
+                    rng=random.Random(args.seed),
+                    bulk_size=args.bulk_size,
+                    per_page=args.per_page,
+                )
+                await _seed(ctx, args.seed_items)
+
+                results: dict[str, list[dict[str, Any]]] = {}
+                for name in args.scenarios:
+                    results[name] = []
+                    for level in args.concurrency:
+                        results[name].append(
+                            await _run_level(
+                                ctx, REQUESTS[name], level, args.duration, args.warmup
+                            )
+                        )
+        return {
+            "meta": {
+                "python": platform.python_version(),
+                "workers": args.workers,
+                "db_pool_size": args.pool_size,
+                "duration_s": args.duration,
+                "warmup_s": args.warmup,
+                "seed_items": args.seed_items,
+                "jwks_fetches": stub.jwks_fetches,
+            },
+            "results": results,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    db = parser.add_mutually_exclusive_group(required=True)
+    db.add_argument(
+        "--database-url", help="asyncpg URL of a local, disposable database"
+    )
+    db.add_argument(
+        "--docker", action="store_true", help="start a throwaway postgres:16 container"
+    )
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS)
+    )
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="seconds measured per level"
+    )
+    parser.add_argument(
+        "--warmup", type=float, default=2.0, help="seconds discarded per level"
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--seed-items", type=int, default=2000)
+    parser.add_argument("--bulk-size", type=int, default=50)
+    parser.add_argument("--per-page", type=int, default=50)
+    parser.add_argument("--alg", choices=["ES256", "RS256"], default="ES256")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--request-timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.docker:
+        with disposable_postgres() as database_url:
+            report = asyncio.run(_benchmark(args, database_url))
+    else:
+        report = asyncio.run(_benchmark(args, args.database_url))
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""CPU cost vs. size reduction of the response compression encodings.
+
+Usage:
+    python -m benchmarks.compression
+    python -m benchmarks.compression --items 50 200 1000 --description-length 600 \\
+        --output compression_output.json
+
+Builds `list_items`-shaped JSON bodies from the synthetic item generator
+(`app.tools.seed`) and compresses them with every available encoding at
+several levels, using the same compressors as `CompressionMiddleware`.
+Reports compression ratio, CPU milliseconds per MB of input and MB/s for
+both a single buffered body and the chunked (streamed) path.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import time
+from datetime import UTC, datetime
+from typing import Any
+
+from app.core.compression import available_encodings, compress_body, new_compressor
+from app.schemas.item import ItemRead
+from app.tools.seed import SeedOptions, _item_rows
+from app.utils.response import list_response
+
+LEVELS = {"gzip": [1, 5, 9], "br": [1, 4, 11], "zstd": [1, 3, 10]}
+
+
+def _payload(items: int, description_length: int, seed: int) -> bytes:
+    opts = SeedOptions(
+        dsn="",
+        seed=seed,
+        batch_size=items,
+        price_distribution="lognormal",
+        min_price=1.0,
+        max_price=5000.0,
+        null_description_ratio=0.1,
+        description_length=description_length,
+        days=365,
+        now=datetime(2025, 1, 1, tzinfo=UTC),
+    )
+    rows = [
+        ItemRead(
+            id=index + 1,
+            name=name,
+            description=description,
+            price=price,
+            tax=tax,
+            created_at=created_at,
+            updated_at=updated_at,
+        )
+        for index, (name, description, price, tax, created_at, updated_at) in enumerate(
+            _item_rows(opts, 0, items)
+        )
+    ]
+    response = list_response(data=rows, table_name="items", per_page=items, total=items)
+    return response.model_dump_json().encode()
+
+
+def _cpu_seconds(fn, min_time: float) -> tuple[float, int]:
+    """Average process CPU time of `fn()`, repeated for at least `min_time`."""
+    runs = 0
+    started = time.process_time()
+    while True:
+        fn()
+        runs += 1
+        elapsed = time.process_time() - started
+        if elapsed >= min_time:
+            return elapsed / runs, runs
+
+
+def _measure(
+    body: bytes, encoding: str, level: int, chunk_size: int, min_time: float
+) -> dict[str, Any]:
+    def buffered() -> bytes:
+        return compress_body(encoding, body, level)
+
+    def streamed() -> int:
+        compressor = new_compressor(encoding, level)
+        size = 0
+        for offset in range(0, len(body), chunk_size):
+            size += len(compressor.compress(body[offset : offset + chunk_size]))
+        return size + len(compressor.finish())
+
+    mb = len(body) / 1_000_000
+    buffered_cpu, runs = _cpu_seconds(buffered, min_time)
+    streamed_cpu, _ = _cpu_seconds(streamed, min_time)
+    buffered_size = len(buffered())
+    streamed_size = streamed()
+    return {
+        "level": level,
+        "runs": runs,
+        "buffered": {
+            "bytes": buffered_size,
+            "ratio": round(len(body) / buffered_size, 2),
+            "cpu_ms_per_mb": round(buffered_cpu * 1000 / mb, 2),
+            "mb_per_s": round(mb / buffered_cpu, 1),
+        },
+        "streamed": {
+            "bytes": streamed_size,
+            "ratio": round(len(body) / streamed_size, 2),
+            "cpu_ms_per_mb": round(streamed_cpu * 1000 / mb, 2),
+            "mb_per_s": round(mb / streamed_cpu, 1),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", nargs="+", type=int, default=[50, 200, 1000])
+    parser.add_argument("--description-length", type=int, default=300)
+    parser.add_argument(
+        "--encodings",
+        nargs="+",
+        choices=available_encodings(),
+        default=available_encodings(),
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=16 * 1024, help="bytes per streamed chunk"
+    )
+    parser.add_argument(
+        "--min-time", type=float, default=0.5, help="CPU seconds per measurement"
+    )
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    results: dict[str, Any] = {}
+    for items in args.items:
+        body = _payload(items, args.description_length, args.seed)
+        results[str(items)] = {
+            "body_bytes": len(body),
+            "encodings": {
+                encoding: [
+                    _measure(body, encoding, level, args.chunk_size, args.min_time)
+                    for level in LEVELS[encoding]
+                ]
+                for encoding in args.encodings
+            },
+        }
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "description_length": args.description_length,
+            "chunk_size": args.chunk_size,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Prepared-statement modes behind a transaction pooler, query by query.
+
+Usage:
+    python -m benchmarks.prepared_statements --database-url postgresql+asyncpg://...
+    python -m benchmarks.prepared_statements --docker --concurrency 1 16 \\
+        --iterations 2000 --output prepared_output.json
+
+Runs the hot item queries (get by id, list page + count) directly through
+SQLAlchemy – no HTTP – under each statement mode:
+
+- `direct`   – plain connection, asyncpg + SQLAlchemy statement caches on
+- `uncached` – pooler default: unique statement names, no cache
+- `cached`   – pooler with DB_POOLER_PREPARED_STATEMENTS=true
+
+Point `--database-url` at PgBouncer (>= 1.21, `max_prepared_statements` > 0)
+to measure the real thing; against plain Postgres the pooler modes are forced
+with DB_TRANSACTION_POOLER=true, which still shows the parse/plan overhead of
+the uncached mode.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import time
+from typing import Any
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.models.item import Item
+from app.utils.db import get_asyncpg_connect_args
+from benchmarks.harness import (
+    LatencyRecorder,
+    disposable_postgres,
+    migrate,
+    wait_for_postgres,
+)
+
+MODES: dict[str, dict[str, str]] = {
+    "direct": {
+        "DB_TRANSACTION_POOLER": "false",
+        "DB_POOLER_PREPARED_STATEMENTS": "false",
+    },
+    "uncached": {
+        "DB_TRANSACTION_POOLER": "true",
+        "DB_POOLER_PREPARED_STATEMENTS": "false",
+    },
+    "cached": {
+        "DB_TRANSACTION_POOLER": "true",
+        "DB_POOLER_PREPARED_STATEMENTS": "true",
+    },
+}
+QUERIES = ("get_by_id", "list_page")
+
+
+def _engine_for(mode: str, database_url: str, pool_size: int) -> AsyncEngine:
+    os.environ.update(MODES[mode])
+    return create_async_engine(
+        database_url,
+        connect_args=get_asyncpg_connect_args(database_url),
+        pool_size=pool_size,
+        max_overflow=0,
+    )
+
+
+async def _seed(engine: AsyncEngine, count: int, rng: random.Random) -> list[int]:
+    async with engine.begin() as conn:
+        existing = list((await conn.scalars(select(Item.id))).all())
+        missing = count - len(existing)
+        if missing > 0:
+            rows = [
+                {
+                    "name": f"bench-{i}",
+                    "price": round(rng.uniform(1, 500), 2),
+                    "tax": 0.0,
+                }
+                for i in range(missing)
+            ]
+            existing += (
+                await conn.scalars(insert(Item).returning(Item.id), rows)
+            ).all()
+    return existing
+
+
+async def _run_query(
+    engine: AsyncEngine,
+    query: str,
+    item_ids: list[int],
+    rng: random.Random,
+    per_page: int,
+) -> None:
+    # One transaction per call, like a request behind a transaction pooler.
+    async with engine.begin() as conn:
+        if query == "get_by_id":
+            await conn.execute(select(Item).where(Item.id == rng.choice(item_ids)))
+        else:
+            await conn.scalar(select(func.count(Item.id)))
+            offset = rng.randrange(max(1, len(item_ids) - per_page))
+            await conn.execute(
+                select(Item).offset(offset).limit(per_page).order_by(Item.id)
+            )
+
+
+async def _measure(
+    engine: AsyncEngine,
+    query: str,
+    item_ids: list[int],
+    *,
+    iterations: int,
+    concurrency: int,
+    per_page: int,
+    seed: int,
+) -> dict[str, Any]:
+    recorder = LatencyRecorder()
+    remaining = iterations
+
+    async def worker(index: int) -> None:
+        nonlocal remaining
+        rng = random.Random(f"{seed}:{index}")
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                await _run_query(engine, query, item_ids, rng, per_page)
+            except (SQLAlchemyError, OSError):
+                recorder.add(time.perf_counter() - started, None)
+            else:
+                recorder.add(time.perf_counter() - started, 200)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return recorder.summary(time.perf_counter() - started)
+
+
+async def _benchmark(args: argparse.Namespace, database_url: str) -> dict[str, Any]:
+    rng = random.Random(args.seed)
+    results: dict[str, Any] = {}
+    item_ids: list[int] = []
+    for mode in args.modes:
+        engine = _engine_for(mode, database_url, max(args.concurrency))
+        try:
+            if not item_ids:
+                item_ids = await _seed(engine, args.seed_items, rng)
+            results[mode] = {}
+            for query in args.queries:
+                for concurrency in args.concurrency:
+                    # Warm-up fills the statement caches the mode allows.
+                    await _measure(
+                        engine,
+                        query,
+                        item_ids,
+                        iterations=args.warmup,
+                        concurrency=concurrency,
+                        per_page=args.per_page,
+                        seed=args.seed,
+                    )
+                    results[mode].setdefault(query, {})[
+                        str(concurrency)
+                    ] = await _measure(
+                        engine,
+                        query,
+                        item_ids,
+                        iterations=args.iterations,
+                        concurrency=concurrency,
+                        per_page=args.per_page,
+                        seed=args.seed,
+                    )
+        finally:
+            await engine.dispose()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "iterations": args.iterations,
+            "per_page": args.per_page,
+            "seed_items": args.seed_items,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    db = parser.add_mutually_exclusive_group(required=True)
+    db.add_argument(
+        "--database-url", help="asyncpg URL of a local, disposable database"
+    )
+    db.add_argument(
+        "--docker", action="store_true", help="start a throwaway postgres:16 container"
+    )
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--queries", nargs="+", choices=QUERIES, default=list(QUERIES))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8])
+    parser.add_argument(
+        "--iterations", type=int, default=1000, help="queries measured per level"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=100, help="queries discarded per level"
+    )
+    parser.add_argument("--seed-items", type=int, default=2000)
+    parser.add_argument("--per-page", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.docker:
+        with disposable_postgres() as database_url:
+            asyncio.run(wait_for_postgres(database_url))
+            migrate(
+                {**os.environ, "DATABASE_URL": database_url, "DB_SSLMODE": "disable"}
+            )
+            report = asyncio.run(_benchmark(args, database_url))
+    else:
+        report = asyncio.run(_benchmark(args, args.database_url))
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
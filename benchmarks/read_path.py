@@ -0,0 +1,191 @@
+"""ORM vs Core read path for item list pages.
+
+Usage:
+    python -m benchmarks.read_path --database-url postgresql+asyncpg://...
+    python -m benchmarks.read_path --docker --per-page 50 200 --iterations 500 \\
+        --output read_path_output.json
+
+Fetches list pages through `ItemService` (query cache bypassed) and renders
+them the way FastAPI renders `list_items`, once per read path:
+
+- `orm`  – `get_all`: Item instances in the identity map + `ItemRead`
+- `core` – `get_rows`: Core select(), row dicts passed straight through
+
+Reports wall-clock latency, process CPU time per row (query decoding plus
+object construction and serialization) and the peak Python memory allocated
+per page, measured with tracemalloc in a separate pass.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import time
+import tracemalloc
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.api.v1.endpoints.items import _serialize
+from app.services.item import ItemService
+from app.utils.db import get_asyncpg_connect_args
+from app.utils.response import list_response
+from benchmarks.harness import (
+    LatencyRecorder,
+    disposable_postgres,
+    migrate,
+    wait_for_postgres,
+)
+from benchmarks.prepared_statements import _seed
+
+# Undecorated service methods, so every page really hits the database.
+PATHS = {
+    "orm": ItemService.get_all.__wrapped__,
+    "core": ItemService.get_rows.__wrapped__,
+}
+
+
+async def _render_page(
+    sessions: async_sessionmaker[AsyncSession], path: str, skip: int, per_page: int
+) -> bytes:
+    async with sessions() as session:
+        items, total = await PATHS[path](
+            ItemService(session), skip=skip, limit=per_page
+        )
+        data = [_serialize(item, None) for item in items]
+        response = list_response(
+            data=data, table_name="items", per_page=per_page, total=total
+        )
+        return JSONResponse(jsonable_encoder(response)).body
+
+
+async def _measure(
+    sessions: async_sessionmaker[AsyncSession],
+    path: str,
+    *,
+    total_items: int,
+    per_page: int,
+    iterations: int,
+    seed: int,
+) -> dict[str, Any]:
+    rng = random.Random(seed)
+    recorder = LatencyRecorder()
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        skip = rng.randrange(max(1, total_items - per_page))
+        page_started = time.perf_counter()
+        await _render_page(sessions, path, skip, per_page)
+        recorder.add(time.perf_counter() - page_started, 200)
+    summary = recorder.summary(time.perf_counter() - started)
+    cpu = time.process_time() - cpu_started
+    summary["cpu_us_per_row"] = round(cpu / (iterations * per_page) * 1e6, 2)
+    return summary
+
+
+async def _peak_memory(
+    sessions: async_sessionmaker[AsyncSession], path: str, *, per_page: int, pages: int
+) -> int:
+    """Mean peak of Python allocations while fetching + rendering one page."""
+    peaks = []
+    for page in range(pages):
+        tracemalloc.start()
+        await _render_page(sessions, path, page * per_page, per_page)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return sum(peaks) // len(peaks)
+
+
+async def _benchmark(args: argparse.Namespace, database_url: str) -> dict[str, Any]:
+    engine = create_async_engine(
+        database_url, connect_args=get_asyncpg_connect_args(database_url), pool_size=1
+    )
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    results: dict[str, Any] = {}
+    try:
+        item_ids = await _seed(engine, args.seed_items, random.Random(args.seed))
+        for path in args.paths:
+            results[path] = {}
+            for per_page in args.per_page:
+                # Warm-up: statement caches, compiled SQL, imports.
+                await _measure(
+                    sessions,
+                    path,
+                    total_items=len(item_ids),
+                    per_page=per_page,
+                    iterations=args.warmup,
+                    seed=args.seed,
+                )
+                summary = await _measure(
+                    sessions,
+                    path,
+                    total_items=len(item_ids),
+                    per_page=per_page,
+                    iterations=args.iterations,
+                    seed=args.seed,
+                )
+                summary["peak_kib_per_page"] = round(
+                    await _peak_memory(sessions, path, per_page=per_page, pages=20)
+                    / 1024,
+                    1,
+                )
+                results[path][str(per_page)] = summary
+    finally:
+        await engine.dispose()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "iterations": args.iterations,
+            "seed_items": args.seed_items,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    db = parser.add_mutually_exclusive_group(required=True)
+    db.add_argument(
+        "--database-url", help="asyncpg URL of a local, disposable database"
+    )
+    db.add_argument(
+        "--docker", action="store_true", help="start a throwaway postgres:16 container"
+    )
+    parser.add_argument("--paths", nargs="+", choices=list(PATHS), default=list(PATHS))
+    parser.add_argument("--per-page", nargs="+", type=int, default=[200])
+    parser.add_argument(
+        "--iterations", type=int, default=300, help="pages measured per size"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=30, help="pages discarded per size"
+    )
+    parser.add_argument("--seed-items", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.docker:
+        with disposable_postgres() as database_url:
+            asyncio.run(wait_for_postgres(database_url))
+            migrate(
+                {**os.environ, "DATABASE_URL": database_url, "DB_SSLMODE": "disable"}
+            )
+            report = asyncio.run(_benchmark(args, database_url))
+    else:
+        report = asyncio.run(_benchmark(args, args.database_url))
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
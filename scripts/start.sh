@@ -12,5 +12,4 @@ exec gunicorn app.main:app \
     --workers "${WORKERS:-1}" \
     --bind "0.0.0.0:${PORT:-8000}" \
     --timeout 120 \
-    --graceful-timeout 30 \
-    --access-logfile -
+    --graceful-timeout 30
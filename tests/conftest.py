@@ -0,0 +1,62 @@
+"""Shared fixtures.
+
+Async tests run on anyio's pytest plugin (asyncio backend). Tests marked
+`requires_db` need a migrated Postgres at `DATABASE_URL` (`make upgrade`)
+and are skipped when it can't be reached.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import asyncpg
+import pytest
+from sqlalchemy import event
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def _database_available() -> bool:
+    dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+    async def probe() -> None:
+        conn = await asyncpg.connect(dsn, timeout=3)
+        await conn.close()
+
+    try:
+        asyncio.run(probe())
+    except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError):
+        return False
+    return True
+
+
+requires_db = pytest.mark.skipif(
+    not _database_available(), reason=f"no database at {settings.DATABASE_URL}"
+)
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def pool_peak() -> AsyncIterator[dict[str, int]]:
+    """Most connections the primary pool had checked out at once during the
+    test. Pools are disposed afterwards: each test runs on its own loop."""
+    from app.database import dispose_engines, engine
+
+    peak = {"checked_out": 0}
+
+    def on_checkout(*_: object) -> None:
+        peak["checked_out"] = max(peak["checked_out"], engine.pool.checkedout())
+
+    event.listen(engine.sync_engine, "checkout", on_checkout)
+    try:
+        yield peak
+    finally:
+        event.remove(engine.sync_engine, "checkout", on_checkout)
+        await dispose_engines()
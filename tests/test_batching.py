@@ -0,0 +1,43 @@
+"""`MicroBatcher` (`app.core.batching`)."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.core.batching import MicroBatcher
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_values_are_handled_in_one_batch():
+    batches: list[list[int]] = []
+
+    async def handler(values: list[int]) -> list[int | BaseException]:
+        batches.append(values)
+        return [ValueError("odd") if value % 2 else value * 10 for value in values]
+
+    batcher = MicroBatcher("test", handler, max_size=10, max_delay=0.01)
+    results = await asyncio.gather(
+        *(batcher.submit(value) for value in range(4)), return_exceptions=True
+    )
+
+    assert batches == [[0, 1, 2, 3]]
+    assert results[0] == 0 and results[2] == 20
+    assert isinstance(results[1], ValueError) and isinstance(results[3], ValueError)
+
+
+async def test_wrong_result_count_fails_every_caller():
+    async def handler(values: list[int]) -> list[int]:
+        return values[:-1]
+
+    batcher = MicroBatcher("test", handler, max_size=3, max_delay=0.01)
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            *(batcher.submit(value) for value in range(3)), return_exceptions=True
+        ),
+        timeout=1,
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
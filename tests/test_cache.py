@@ -0,0 +1,38 @@
+"""Cache backend selection (`app.core.cache`)."""
+
+from __future__ import annotations
+
+import sys
+
+import pytest
+
+from app.core.cache import get_cache, settings
+from app.main import app, lifespan
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_startup_fails_when_redis_backend_is_unavailable(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "redis")
+    monkeypatch.setitem(sys.modules, "redis", None)  # not installed
+    monkeypatch.setitem(sys.modules, "redis.asyncio", None)
+    get_cache.cache_clear()
+    try:
+        with pytest.raises(RuntimeError, match="requires the `redis` package"):
+            async with lifespan(app):
+                pass
+    finally:
+        get_cache.cache_clear()
+
+
+async def test_redis_backend_fails_open_when_unreachable():
+    pytest.importorskip("redis")
+    from app.core.cache import RedisCache
+
+    cache = RedisCache("redis://127.0.0.1:1/0")  # nothing listens on port 1
+    try:
+        await cache.set("key", {"value": 1}, ttl=60)
+        assert await cache.get("key") is None
+        await cache.delete_prefix("")
+    finally:
+        await cache.close()
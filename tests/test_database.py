@@ -0,0 +1,45 @@
+"""Read/write routing of the request session (`app.database`)."""
+
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from app.database import async_session_factory, engine, get_db
+from app.models.item import Item
+from app.services.auth import AuthService
+from tests.conftest import requires_db
+
+pytestmark = [pytest.mark.anyio, requires_db]
+
+
+async def test_read_then_write_holds_one_connection(pool_peak):
+    async with async_session_factory() as session:
+        session.info["replica_ok"] = True  # as set by get_read_db
+        await session.scalar(select(func.count(Item.id)))
+
+        # First-login provisioning: the session switches to the primary.
+        await AuthService(session).get_or_create_user_for_supabase(
+            supabase_user_id=str(uuid.uuid4()),
+            email=f"{uuid.uuid4().hex[:12]}@example.com",
+        )
+        await session.scalar(select(func.count(Item.id)))
+        await session.rollback()
+
+    assert pool_peak["checked_out"] == 1
+    assert engine.pool.checkedout() == 0
+
+
+async def test_get_db_after_reads_holds_one_connection(pool_peak):
+    async with async_session_factory() as session:
+        session.info["replica_ok"] = True  # auth read through get_read_db
+        await session.scalar(select(func.count(Item.id)))
+
+        # The endpoint's own `get_db` pins the same session to the primary.
+        await get_db(session)
+        await session.scalar(select(func.count(Item.id)))
+        await session.rollback()
+
+    assert pool_peak["checked_out"] == 1
@@ -0,0 +1,49 @@
+"""Health endpoints (`app.api.v1.endpoints.health`)."""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from app.core import readiness
+from app.main import app
+from tests.conftest import requires_db
+
+pytestmark = [pytest.mark.anyio, requires_db]
+
+
+async def test_health_probes_on_demand_before_first_background_probe(monkeypatch):
+    monkeypatch.setitem(readiness._DB_PROBE, "ok", None)  # fresh worker
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            response = await client.get("/api/v1/health")
+    finally:
+        await readiness.dispose_probe_engine()
+
+    assert response.status_code == 200
+    assert response.json()["data"]["database"] == "ok"
+
+
+@pytest.mark.parametrize("read_path", ["core", "orm"])
+async def test_warm_up_primes_the_configured_list_query(
+    monkeypatch, pool_peak, read_path
+):
+    from app.services.item import ItemService
+
+    calls: list[str] = []
+    for name in ("get_all", "get_rows"):
+        original = getattr(ItemService, name)
+
+        async def spy(self, *args, _name=name, _original=original, **kwargs):
+            calls.append(_name)
+            return await _original(self, *args, **kwargs)
+
+        monkeypatch.setattr(ItemService, name, spy)
+    monkeypatch.setattr(readiness.settings, "ITEM_READ_PATH", read_path)
+
+    await readiness._prime_statements()
+
+    assert calls == ["get_rows" if read_path == "core" else "get_all"]
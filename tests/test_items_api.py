@@ -0,0 +1,87 @@
+"""Item write endpoints – pool usage per request."""
+
+from __future__ import annotations
+
+import uuid
+from collections.abc import AsyncIterator
+
+import httpx
+import pytest
+
+from app.api import deps
+from app.config import get_settings
+from app.core.idempotency import close_idempotency_store, get_idempotency_store
+from app.main import app
+from app.services.auth import identity_cache
+from tests.conftest import requires_db
+
+pytestmark = [pytest.mark.anyio, requires_db]
+
+
+@pytest.fixture
+async def client(monkeypatch) -> AsyncIterator[httpx.AsyncClient]:
+    # Any bearer token is accepted as `sub:email`; JWT verification itself is
+    # not under test here.
+    async def decode(token: str) -> dict[str, str]:
+        sub, email = token.split(":")
+        return {"sub": sub, "email": email}
+
+    monkeypatch.setattr(deps, "decode_supabase_jwt", decode)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        yield http
+
+
+@pytest.fixture
+async def idempotency_backend(request, monkeypatch) -> AsyncIterator[str]:
+    """The store named by the test's parameter; None sends no key."""
+    if request.param is not None:
+        monkeypatch.setattr(get_settings(), "IDEMPOTENCY_BACKEND", request.param)
+    get_idempotency_store.cache_clear()
+    try:
+        yield request.param
+    finally:
+        await close_idempotency_store()
+        get_idempotency_store.cache_clear()
+
+
+def _auth() -> dict[str, str]:
+    sub, email = uuid.uuid4(), f"{uuid.uuid4().hex[:12]}@example.com"
+    return {"Authorization": f"Bearer {sub}:{email}"}
+
+
+@pytest.mark.parametrize(
+    "idempotency_backend", [None, "memory", "postgres"], indirect=True
+)
+async def test_cold_cache_create_uses_one_connection(
+    client, pool_peak, idempotency_backend
+):
+    headers = _auth()
+    # Provision the user, then forget it so auth has to look it up.
+    assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 200
+    await identity_cache.invalidate()
+    pool_peak["checked_out"] = 0
+
+    if idempotency_backend is not None:
+        headers["Idempotency-Key"] = str(uuid.uuid4())
+    response = await client.post(
+        "/api/v1/items", json={"name": "widget", "price": 1.5}, headers=headers
+    )
+
+    assert response.status_code == 201
+    assert pool_peak["checked_out"] == 1
+
+
+@pytest.mark.parametrize("idempotency_backend", ["memory", "postgres"], indirect=True)
+async def test_first_login_bulk_import_uses_one_connection(
+    client, pool_peak, idempotency_backend
+):
+    headers = {**_auth(), "Idempotency-Key": str(uuid.uuid4())}
+    response = await client.post(
+        "/api/v1/items/bulk/import",
+        json=[{"name": "a", "price": 1}, {"name": "b", "price": 2}],
+        headers=headers,
+    )
+
+    assert response.status_code == 201
+    assert pool_peak["checked_out"] == 1
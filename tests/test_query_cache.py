@@ -0,0 +1,74 @@
+"""`@cached_query` – invalidation vs. reads that are still in flight."""
+
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.query_cache import apply_invalidations, cached_query, invalidate_on_commit
+
+pytestmark = pytest.mark.anyio
+
+ROWS: dict[int, str] = {}
+
+
+class _Service:
+    """Stands in for a service: `db` only needs `info`."""
+
+    def __init__(self, gate: asyncio.Event | None = None) -> None:
+        self.db = SimpleNamespace(info={})
+        self.gate = gate
+        self.queries = 0
+
+    @cached_query(
+        "tests.lookup", ttl=60, dump=lambda value: value, load=lambda value: value
+    )
+    async def lookup(self, item_id: int) -> str:
+        self.queries += 1
+        value = ROWS[item_id]  # the "query" sees the current rows ...
+        if self.gate is not None:
+            await self.gate.wait()  # ... and is slow to return them
+        return value
+
+
+@pytest.fixture(autouse=True)
+async def _reset() -> None:
+    ROWS.clear()
+    await _Service.lookup.cache.invalidate()
+
+
+async def _commit_write(item_id: int, value: str, *, all_entries: bool = False) -> None:
+    """Write + commit: the request session applies invalidations afterwards."""
+    ROWS[item_id] = value
+    session = SimpleNamespace(info={})
+    if all_entries:
+        invalidate_on_commit(session, _Service.lookup)
+    else:
+        invalidate_on_commit(session, _Service.lookup, item_id)
+    await apply_invalidations(session)
+
+
+@pytest.mark.parametrize("all_entries", [False, True])
+async def test_read_in_flight_during_commit_is_not_cached(all_entries):
+    ROWS[1] = "old"
+    gate = asyncio.Event()
+    slow_read = asyncio.create_task(_Service(gate).lookup(1))
+    await asyncio.sleep(0)  # the read has queried and is waiting
+
+    await _commit_write(1, "new", all_entries=all_entries)
+    gate.set()
+    assert await slow_read == "old"  # its own response is what it saw
+
+    assert await _Service().lookup(1) == "new"
+
+
+async def test_reads_after_invalidation_are_cached_again():
+    ROWS[1] = "old"
+    await _commit_write(1, "new")
+
+    first, second = _Service(), _Service()
+    assert await first.lookup(1) == "new"
+    assert await second.lookup(1) == "new"
+    assert (first.queries, second.queries) == (1, 0)
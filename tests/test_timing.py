@@ -0,0 +1,50 @@
+"""`Server-Timing` phases (`app.core.timing`)."""
+
+from __future__ import annotations
+
+import time
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+from pydantic import BaseModel
+
+from app.core.timing import ServerTimingMiddleware, TimedRoute, phase
+
+pytestmark = pytest.mark.anyio
+
+
+class SlowToEncode(BaseModel):
+    value: int
+
+    def model_dump(self, *args, **kwargs):
+        time.sleep(0.05)
+        return super().model_dump(*args, **kwargs)
+
+
+def _phases(header: str) -> dict[str, float]:
+    phases = {}
+    for part in header.split(", "):
+        name, duration = part.split(";dur=")
+        phases[name] = float(duration)
+    return phases
+
+
+async def test_serialize_includes_encoding_after_the_endpoint():
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get("/slow")
+    async def slow():
+        with phase("serialize"):
+            return {"data": SlowToEncode(value=1)}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(ServerTimingMiddleware)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/slow")
+
+    assert response.json() == {"data": {"value": 1}}
+    assert _phases(response.headers["Server-Timing"])["serialize"] >= 50